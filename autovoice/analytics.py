@@ -0,0 +1,169 @@
+import logging
+import math
+import os
+import struct
+import time
+from array import array
+from datetime import datetime, timezone
+
+class RingBuffer:
+    """Fixed-capacity ring buffer stored in an ``array.array``."""
+
+    def __init__(self, typecode, capacity):
+        self.data = array(typecode, [0]) * capacity
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, value):
+        index = (self.start + self.size) % self.capacity
+        self.data[index] = value
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def extend(self, values):
+        for value in values[-self.capacity:]:
+            self.append(value)
+
+    def values(self):
+        end = self.start + self.size
+        if end <= self.capacity:
+            return self.data[self.start:end]
+        return self.data[self.start:] + self.data[:end - self.capacity]
+
+class GuildUsage:
+    SAMPLE_CAPACITY = 7 * 24 * 60
+    SESSION_CAPACITY = 5000
+    HEADER = struct.Struct("<II")
+
+    def __init__(self):
+        self.times = RingBuffer("I", self.SAMPLE_CAPACITY)
+        self.live = RingBuffer("H", self.SAMPLE_CAPACITY)
+        self.members = RingBuffer("H", self.SAMPLE_CAPACITY)
+        self.sessions = RingBuffer("I", self.SESSION_CAPACITY)
+        self.open_sessions = {}
+        self.dirty = False
+
+    def to_bytes(self):
+        parts = [self.HEADER.pack(len(self.times), len(self.sessions))]
+        for buffer in (self.times, self.live, self.members, self.sessions):
+            parts.append(buffer.values().tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, raw):
+        usage = cls()
+        samples, sessions = cls.HEADER.unpack_from(raw)
+        offset = cls.HEADER.size
+        for buffer, count in (
+            (usage.times, samples), (usage.live, samples), (usage.members, samples), (usage.sessions, sessions)
+        ):
+            values = array(buffer.data.typecode)
+            length = count * values.itemsize
+            values.frombytes(raw[offset:offset + length])
+            offset += length
+            buffer.extend(values)
+        return usage
+
+class UsageTracker:
+    """Per-guild voice occupancy samples and session lengths.
+
+    Everything is kept in ring buffers in memory; ``save`` writes the guilds that
+    changed since the last save to one small binary file each.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.guilds = {}
+
+    def get(self, guild_id):
+        usage = self.guilds.get(guild_id)
+        if usage is None:
+            usage = self.guilds[guild_id] = GuildUsage()
+        return usage
+
+    def session_started(self, guild_id, channel_id):
+        self.get(guild_id).open_sessions[channel_id] = time.time()
+
+    def session_ended(self, guild_id, channel_id):
+        usage = self.guilds.get(guild_id)
+        started = usage.open_sessions.pop(channel_id, None) if usage else None
+        if started is not None:
+            usage.sessions.append(int(time.time() - started))
+            usage.dirty = True
+
+    def sample(self, guild_id, live, members, now=None):
+        usage = self.get(guild_id)
+        usage.times.append(int(now or time.time()))
+        usage.live.append(min(live, 0xFFFF))
+        usage.members.append(min(members, 0xFFFF))
+        usage.dirty = True
+
+    def load(self):
+        if not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            name, ext = os.path.splitext(filename)
+            if ext != ".bin" or not name.isdigit():
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), "rb") as f:
+                    self.guilds[int(name)] = GuildUsage.from_bytes(f.read())
+            except (OSError, ValueError, struct.error) as e:
+                logging.error(f"Skipping unreadable AutoVoice usage file {filename}: {e}")
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for guild_id, usage in list(self.guilds.items()):
+            if not usage.dirty:
+                continue
+            usage.dirty = False
+            path = os.path.join(self.directory, f"{guild_id}.bin")
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(usage.to_bytes())
+            os.replace(f"{path}.tmp", path)
+
+    def forget(self, guild_id):
+        self.guilds.pop(guild_id, None)
+        path = os.path.join(self.directory, f"{guild_id}.bin")
+        if os.path.exists(path):
+            os.remove(path)
+
+    def report(self, guild_id):
+        usage = self.guilds.get(guild_id)
+        if usage is None or not len(usage.times):
+            return None
+
+        live = usage.live.values()
+        members = usage.members.values()
+        sessions = sorted(usage.sessions.values())
+        totals = [[0] * 24 for _ in range(7)]
+        counts = [[0] * 24 for _ in range(7)]
+        for timestamp, value in zip(usage.times.values(), live):
+            moment = datetime.fromtimestamp(timestamp, timezone.utc)
+            totals[moment.weekday()][moment.hour] += value
+            counts[moment.weekday()][moment.hour] += 1
+
+        return {
+            "samples": len(live),
+            "since": usage.times.values()[0],
+            "peak_channels": max(live),
+            "peak_members": max(members),
+            "sessions": len(sessions),
+            "session_percentiles": {p: percentile(sessions, p) for p in (50, 90, 99)},
+            "heatmap": [
+                [total / count if count else None for total, count in zip(day_totals, day_counts)]
+                for day_totals, day_counts in zip(totals, counts)
+            ],
+        }
+
+def percentile(values, p):
+    if not values:
+        return None
+    index = max(0, math.ceil(p / 100 * len(values)) - 1)
+    return values[index]
@@ -1,12 +1,27 @@
+import asyncio
 import discord
+import logging
+import time
+from datetime import datetime, timedelta, timezone
 from redbot.core import commands, Config
-from .control import (
-    ChannelControlView,
-    LockChannelButton,
-    UnlockChannelButton
-)
+from redbot.core.data_manager import cog_data_path
+from .analytics import UsageTracker
+from .control import ChannelControlView
+from .editor import ChannelEditor
+from .scheduler import CreationScheduler
+from .state import GuildState
+from .sweeper import ChannelSweeper
 
 class AutoVoice(commands.Cog):
+    FLUSH_INTERVAL = 15
+    USAGE_SAMPLE_INTERVAL = 60
+    USAGE_SAVE_INTERVAL = 300
+    POOL_CHANNEL_NAME = "Open Channel"
+    POOL_SHRINK_AFTER = 300
+    POOL_HIGH_WATER = 2
+    STARTUP_CONCURRENCY = 10
+    CONTROL_VIEW_VERSION = 2
+
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=3498571294, force_registration=True)
@@ -14,66 +29,310 @@ class AutoVoice(commands.Cog):
             "trigger_channel_id": None,
             "control_channel_id": None,
             "control_message_id": None,
-            "channel_owners": {}
+            "control_view_version": 0,
+            "channel_owners": {},
+            "pool_size": 0,
+            "pool_channels": [],
+            "grace_period": 0
         }
         self.config.register_guild(**default_guild)
-        self.created_channels = set()
+        self.guild_states = {}
+        self.dirty_guilds = set()
+        self.flush_task = None
+        self.creation_queue = CreationScheduler()
+        self.editor = ChannelEditor()
+        self.sweeper = ChannelSweeper(self.expire_channel)
+        self.usage_tracker = UsageTracker(str(cog_data_path(self) / "usage"))
+        self.control_view = None
+
+    async def cog_load(self):
+        for guild_id, data in (await self.config.all_guilds()).items():
+            self.guild_states[guild_id] = GuildState(data)
+        await asyncio.to_thread(self.usage_tracker.load)
+        self.control_view = ChannelControlView(self)
+        self.bot.add_view(self.control_view)
+        self.flush_task = asyncio.create_task(self.flush_loop())
+        self.sweeper.start()
+
+    async def cog_unload(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+        if self.control_view:
+            self.control_view.stop()
+        self.creation_queue.cancel()
+        self.editor.cancel()
+        self.sweeper.stop()
+        await self.flush_owners()
+        await asyncio.to_thread(self.usage_tracker.save)
+
+    def get_state(self, guild):
+        state = self.guild_states.get(guild.id)
+        if state is None:
+            state = self.guild_states[guild.id] = GuildState()
+        return state
+
+    async def flush_loop(self):
+        last_sample = last_save = time.monotonic()
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            await self.trim_pools()
+            await self.flush_owners()
+            now = time.monotonic()
+            if now - last_sample >= self.USAGE_SAMPLE_INTERVAL:
+                self.sample_usage()
+                last_sample = now
+            if now - last_save >= self.USAGE_SAVE_INTERVAL:
+                try:
+                    await asyncio.to_thread(self.usage_tracker.save)
+                except OSError as e:
+                    logging.error(f"Failed to save AutoVoice usage data: {e}")
+                last_save = now
+
+    def sample_usage(self):
+        now = time.time()
+        for guild_id, state in self.guild_states.items():
+            guild = self.bot.get_guild(guild_id)
+            if guild is None or not state.trigger_channel_id:
+                continue
+            channels = [channel for channel in map(guild.get_channel, state.channel_owners) if channel]
+            members = sum(len(channel.members) for channel in channels)
+            self.usage_tracker.sample(guild_id, len(channels), members, now)
+
+    async def flush_owners(self):
+        dirty, self.dirty_guilds = self.dirty_guilds, set()
+        for guild_id in dirty:
+            state = self.guild_states.get(guild_id)
+            if state is None:
+                continue
+            try:
+                guild_config = self.config.guild_from_id(guild_id)
+                await guild_config.channel_owners.set(state.owners_to_config())
+                await guild_config.pool_channels.set(state.pool_to_config())
+            except Exception as e:
+                self.dirty_guilds.add(guild_id)
+                logging.error(f"Failed to save AutoVoice channel owners for guild {guild_id}: {e}")
 
     async def set_channel_owner(self, guild, channel_id, member_id):
-        async with self.config.guild(guild).channel_owners() as channel_owners:
-            channel_owners[str(channel_id)] = member_id
+        self.get_state(guild).set_owner(channel_id, member_id)
+        self.dirty_guilds.add(guild.id)
 
-    async def get_channel_owner(self, guild, channel_id):
-        channel_owners = await self.config.guild(guild).channel_owners()
-        return channel_owners.get(str(channel_id), None)
+    async def remove_channel_owner(self, guild, channel_id):
+        self.get_state(guild).remove_channel(channel_id)
+        self.dirty_guilds.add(guild.id)
+
+    def get_channel_owner(self, guild, channel_id):
+        return self.get_state(guild).owner_of(channel_id)
+
+    async def mark_control_view_current(self, guild):
+        state = self.get_state(guild)
+        if state.control_view_version != self.CONTROL_VIEW_VERSION:
+            await self.config.guild(guild).control_view_version.set(self.CONTROL_VIEW_VERSION)
+            state.control_view_version = self.CONTROL_VIEW_VERSION
 
     async def send_control_message(self, channel, guild):
-        view = ChannelControlView(self.bot, channel.id)
-        view.add_item(LockChannelButton(self.bot))
-        view.add_item(UnlockChannelButton(self.bot))
         embed = discord.Embed(title="Channel Management", description="Use the buttons below to control your channel.")
-        message = await channel.send(embed=embed, view=view)
+        message = await channel.send(embed=embed, view=self.control_view)
         await self.config.guild(guild).control_message_id.set(message.id)
+        self.get_state(guild).control_message_id = message.id
+        await self.mark_control_view_current(guild)
 
-    async def update_control_message(self, guild, channel):
-        control_message_id = await self.config.guild(guild).control_message_id()
-        control_channel_id = await self.config.guild(guild).control_channel_id()
+    async def update_control_message(self, guild, channel, force=False):
+        state = self.get_state(guild)
+        control_message_id = state.control_message_id
+        control_channel_id = state.control_channel_id
         if control_channel_id:
             control_channel = self.bot.get_channel(control_channel_id)
             if control_channel:
+                if not force and control_message_id and state.control_view_version == self.CONTROL_VIEW_VERSION:
+                    return
                 try:
                     message = await control_channel.fetch_message(control_message_id)
-                    view = ChannelControlView(self.bot, control_channel.id)
-                    view.add_item(LockChannelButton(self.bot))
-                    view.add_item(UnlockChannelButton(self.bot))
-                    await message.edit(view=view)
+                    await message.edit(view=self.control_view)
+                    await self.mark_control_view_current(guild)
                 except discord.NotFound:
                     await self.send_control_message(control_channel, guild)
 
+    def pool_category(self, guild):
+        trigger_channel = guild.get_channel(self.get_state(guild).trigger_channel_id or 0)
+        return trigger_channel.category if trigger_channel else None
+
+    def can_rename(self, channel_id):
+        return self.editor.next_rename_at(channel_id) <= time.monotonic()
+
+    def pool_overwrites(self, guild):
+        """Overwrites for a pooled channel being handed out, matching a freshly created one."""
+        category = self.pool_category(guild)
+        return dict(category.overwrites) if category else {}
+
+    async def take_pooled_channel(self, member):
+        state = self.get_state(member.guild)
+        while True:
+            channel_id = state.take_idle(usable=self.can_rename)
+            if channel_id is None:
+                break
+            channel = member.guild.get_channel(channel_id)
+            self.dirty_guilds.add(member.guild.id)
+            if channel:
+                await channel.edit(
+                    name=f"{member.display_name}'s channel",
+                    user_limit=0,
+                    overwrites=self.pool_overwrites(member.guild)
+                )
+                self.editor.note_rename(channel.id)
+                self.schedule_pool_refill(member.guild)
+                return channel
+        self.schedule_pool_refill(member.guild)
+        return None
+
+    def schedule_pool_refill(self, guild):
+        state = self.get_state(guild)
+        if state.pool_size and len(state.pool) < state.pool_size:
+            self.creation_queue.submit(guild.id, 0, lambda: self.refill_pool(guild))
+
+    async def refill_pool(self, guild):
+        """Create pooled channels until the pool is full.
+
+        This runs as a single creation job, so every channel after the first is
+        paced through the guild's creation throttle.
+        """
+        state = self.get_state(guild)
+        channel = None
+        while state.pool_size and len(state.pool) < state.pool_size:
+            if channel is not None:
+                await self.creation_queue.throttle(guild.id)
+            channel = await guild.create_voice_channel(
+                name=self.POOL_CHANNEL_NAME,
+                category=self.pool_category(guild),
+                overwrites={guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+            )
+            state.pool[channel.id] = time.time()
+            self.dirty_guilds.add(guild.id)
+        return channel
+
+    async def expire_channel(self, guild_id, channel_id):
+        guild = self.bot.get_guild(guild_id)
+        state = self.guild_states.get(guild_id)
+        channel = guild.get_channel(channel_id) if guild else None
+        if channel is None or state is None:
+            if state:
+                state.remove_channel(channel_id)
+                self.dirty_guilds.add(guild_id)
+            self.editor.discard(channel_id, forget=True)
+            return
+        if channel_id in state.channel_owners and not channel.members:
+            await self.release_channel(channel)
+
+    async def release_channel(self, channel):
+        guild = channel.guild
+        self.sweeper.cancel(channel.id)
+        self.usage_tracker.session_ended(guild.id, channel.id)
+        state = self.get_state(guild)
+        await self.remove_channel_owner(guild, channel.id)
+        pool_has_room = state.pool_size and len(state.pool) < state.pool_size * self.POOL_HIGH_WATER
+        if pool_has_room and self.can_rename(channel.id):
+            self.editor.discard(channel.id)
+            await channel.edit(
+                name=self.POOL_CHANNEL_NAME,
+                user_limit=0,
+                overwrites={guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+            )
+            self.editor.note_rename(channel.id)
+            state.pool[channel.id] = time.time()
+        else:
+            self.editor.discard(channel.id, forget=True)
+            await channel.delete()
+
+    async def trim_pools(self):
+        now = time.time()
+        for guild_id, state in list(self.guild_states.items()):
+            excess = len(state.pool) - state.pool_size
+            if excess <= 0:
+                continue
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
+            expired = sorted(
+                (idle_since, channel_id) for channel_id, idle_since in state.pool.items()
+                if not state.pool_size or now - idle_since >= self.POOL_SHRINK_AFTER
+            )
+            for _, channel_id in expired[:excess]:
+                del state.pool[channel_id]
+                self.dirty_guilds.add(guild_id)
+                self.editor.discard(channel_id, forget=True)
+                channel = guild.get_channel(channel_id)
+                if channel:
+                    try:
+                        await channel.delete()
+                    except discord.HTTPException as e:
+                        logging.error(f"Failed to delete pooled AutoVoice channel {channel_id}: {e}")
+
     @commands.Cog.listener()
     async def on_ready(self):
-        for guild in self.bot.guilds:
-            channel_owners = await self.config.guild(guild).channel_owners()
-            self.created_channels.update(int(channel_id) for channel_id in channel_owners.keys())
-            control_channel_id = await self.config.guild(guild).control_channel_id()
-            if control_channel_id:
-                control_channel = self.bot.get_channel(control_channel_id)
-                if control_channel:
-                    await self.update_control_message(guild, control_channel)
+        semaphore = asyncio.Semaphore(self.STARTUP_CONCURRENCY)
+        await asyncio.gather(*(self.reconcile_guild(guild, semaphore) for guild in self.bot.guilds))
+
+    async def reconcile_guild(self, guild, semaphore):
+        state = self.guild_states.get(guild.id)
+        if state is None:
+            return
+
+        async with semaphore:
+            try:
+                dead_channels = [channel_id for channel_id in state.channel_owners if guild.get_channel(channel_id) is None]
+                dead_pool = [channel_id for channel_id in state.pool if guild.get_channel(channel_id) is None]
+                for channel_id in dead_channels:
+                    state.remove_channel(channel_id)
+                for channel_id in dead_pool:
+                    del state.pool[channel_id]
+                if dead_channels or dead_pool:
+                    self.dirty_guilds.add(guild.id)
+
+                orphaned = [
+                    channel for channel in map(guild.get_channel, list(state.channel_owners))
+                    if not channel.members
+                ]
+                for channel in orphaned:
+                    await self.release_channel(channel)
+
+                if state.control_channel_id:
+                    control_channel = self.bot.get_channel(state.control_channel_id)
+                    if control_channel:
+                        await self.update_control_message(guild, control_channel)
+            except Exception as e:
+                logging.error(f"Failed to reconcile AutoVoice state for guild {guild.id}: {e}")
+
+    async def create_member_channel(self, member, category):
+        state = self.get_state(member.guild)
+        voice = member.voice
+        if not voice or not voice.channel or voice.channel.id != state.trigger_channel_id:
+            return None
+
+        existing_channel = member.guild.get_channel(state.channel_of(member.id) or 0)
+        if existing_channel:
+            await member.move_to(existing_channel)
+            return existing_channel
+
+        new_channel = None
+        if state.pool_size:
+            new_channel = await self.take_pooled_channel(member)
+        if new_channel is None:
+            new_channel = await member.guild.create_voice_channel(
+                name=f"{member.display_name}'s channel",
+                category=category
+            )
+        await self.set_channel_owner(member.guild, new_channel.id, member.id)
+        self.usage_tracker.session_started(member.guild.id, new_channel.id)
+        await member.move_to(new_channel)
+        return new_channel
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
-        trigger_channel_id = await self.config.guild(member.guild).trigger_channel_id()
-        if not trigger_channel_id:
+        state = self.guild_states.get(member.guild.id)
+        if state is None or not state.trigger_channel_id:
             return
 
-        if after.channel and after.channel.id == trigger_channel_id:
-            channel_owners = await self.config.guild(member.guild).channel_owners()
-            existing_channel_id = None
-            for channel_id_str, owner_id in channel_owners.items():
-                if owner_id == member.id:
-                    existing_channel_id = int(channel_id_str)
-                    break
+        if after.channel and after.channel.id == state.trigger_channel_id:
+            existing_channel_id = state.channel_of(member.id)
 
             if existing_channel_id:
                 existing_channel = member.guild.get_channel(existing_channel_id)
@@ -81,29 +340,32 @@ class AutoVoice(commands.Cog):
                     await member.move_to(existing_channel)
                     return
                 else:
-                    async with self.config.guild(member.guild).channel_owners() as owners:
-                        del owners[str(existing_channel_id)]
-                    self.created_channels.discard(existing_channel_id)
+                    await self.remove_channel_owner(member.guild, existing_channel_id)
 
-            new_channel = await member.guild.create_voice_channel(
-                name=f"{member.display_name}'s channel",
-                category=after.channel.category
+            category = after.channel.category
+            self.creation_queue.submit(
+                member.guild.id, member.id, lambda: self.create_member_channel(member, category)
             )
-            self.created_channels.add(new_channel.id)
-            await self.set_channel_owner(member.guild, new_channel.id, member.id)
-            await member.move_to(new_channel)
 
-        if before.channel and before.channel.id in self.created_channels and len(before.channel.members) == 0:
-            await before.channel.delete()
-            self.created_channels.remove(before.channel.id)
-            async with self.config.guild(member.guild).channel_owners() as owners:
-                owners.pop(str(before.channel.id), None)
+        if after.channel and after.channel.id in self.sweeper:
+            self.sweeper.cancel(after.channel.id)
+
+        if before.channel and before.channel.id in state.channel_owners and len(before.channel.members) == 0:
+            if state.grace_period:
+                self.sweeper.schedule(before.channel, state.grace_period)
+            else:
+                await self.release_channel(before.channel)
+
+    def format_delay(self, delay):
+        if delay <= self.editor.debounce + 1:
+            return "in a moment"
+        return discord.utils.format_dt(discord.utils.utcnow() + timedelta(seconds=delay), "R")
 
     async def is_channel_owner(self, ctx):
         if not ctx.author.voice or not ctx.author.voice.channel:
             return False
         user_channel = ctx.author.voice.channel
-        owner_id = await self.get_channel_owner(ctx.guild, user_channel.id)
+        owner_id = self.get_channel_owner(ctx.guild, user_channel.id)
         return owner_id == ctx.author.id
 
     @commands.guild_only()
@@ -117,24 +379,123 @@ class AutoVoice(commands.Cog):
     async def trigger(self, ctx, channel: discord.VoiceChannel):
         """Set the voice channel that triggers a new voice channel to be created."""
         await self.config.guild(ctx.guild).trigger_channel_id.set(channel.id)
+        self.get_state(ctx.guild).trigger_channel_id = channel.id
         await ctx.send(f"Trigger channel set to {channel.name}.")
 
     @autovoiceset.command()
     async def control(self, ctx, channel: discord.TextChannel):
         """Set the control channel where the control buttons will be displayed."""
         await self.config.guild(ctx.guild).control_channel_id.set(channel.id)
+        self.get_state(ctx.guild).control_channel_id = channel.id
         await ctx.send(f"Control channel set to {channel.name}.")
-        control_message_id = await self.config.guild(ctx.guild).control_message_id()
+        control_message_id = self.get_state(ctx.guild).control_message_id
         if control_message_id:
-            await self.update_control_message(ctx.guild, channel)
+            await self.update_control_message(ctx.guild, channel, force=True)
         else:
             await self.send_control_message(channel, ctx.guild)
 
+    @autovoiceset.command()
+    async def pool(self, ctx, size: int):
+        """Keep a number of idle voice channels ready instead of creating and deleting them.
+
+        Set the size to 0 to disable pooling. Channels returned after a busy period are
+        kept for a while and then trimmed back down to the pool size.
+        """
+        if size < 0:
+            await ctx.send("The pool size cannot be negative.")
+            return
+        await self.config.guild(ctx.guild).pool_size.set(size)
+        self.get_state(ctx.guild).pool_size = size
+        if size:
+            self.schedule_pool_refill(ctx.guild)
+            await ctx.send(f"AutoVoice will keep {size} idle channels ready.")
+        else:
+            await self.trim_pools()
+            await ctx.send("Channel pooling has been disabled.")
+
+    @autovoiceset.command()
+    async def grace(self, ctx, seconds: int):
+        """Keep empty channels around for a number of seconds before removing them.
+
+        Anyone rejoining within the grace period keeps the channel. Set to 0 to remove empty channels immediately.
+        """
+        if seconds < 0:
+            await ctx.send("The grace period cannot be negative.")
+            return
+        await self.config.guild(ctx.guild).grace_period.set(seconds)
+        self.get_state(ctx.guild).grace_period = seconds
+        if seconds:
+            await ctx.send(f"Empty channels will be removed after {seconds} seconds.")
+        else:
+            await ctx.send("Empty channels will be removed immediately.")
+
+    @autovoiceset.command()
+    async def queue(self, ctx):
+        """Show how channel creation bursts are being absorbed."""
+        stats = self.creation_queue.get_stats(ctx.guild.id)
+        embed = discord.Embed(title="AutoVoice Creation Queue", color=discord.Color.blurple())
+        embed.add_field(name="Queued", value=str(self.creation_queue.depth(ctx.guild.id)))
+        embed.add_field(name="Peak Depth", value=str(stats.max_depth))
+        embed.add_field(name="Processed", value=str(stats.processed))
+        embed.add_field(name="Deduplicated", value=str(stats.deduped))
+        embed.add_field(name="Failed", value=str(stats.failed))
+        embed.add_field(name="Wait (avg / max)", value=f"{stats.average_wait:.2f}s / {stats.max_wait:.2f}s")
+        await ctx.send(embed=embed)
+
+    @autovoiceset.command()
+    async def usage(self, ctx):
+        """Show voice channel usage recorded over the last week."""
+        report = self.usage_tracker.report(ctx.guild.id)
+        if report is None:
+            await ctx.send("No usage has been recorded for this server yet.")
+            return
+
+        def duration(seconds):
+            if seconds is None:
+                return "n/a"
+            minutes, seconds = divmod(seconds, 60)
+            hours, minutes = divmod(minutes, 60)
+            return f"{hours}h {minutes}m" if hours else f"{minutes}m {seconds}s"
+
+        percentiles = report["session_percentiles"]
+        embed = discord.Embed(title="AutoVoice Usage", color=discord.Color.blurple())
+        embed.add_field(name="Peak Channels", value=str(report["peak_channels"]))
+        embed.add_field(name="Peak Members", value=str(report["peak_members"]))
+        embed.add_field(name="Sessions", value=str(report["sessions"]))
+        embed.add_field(
+            name="Session Length (p50 / p90 / p99)",
+            value=" / ".join(duration(percentiles[p]) for p in (50, 90, 99)),
+            inline=False
+        )
+
+        blocks = " ▁▂▃▄▅▆▇█"
+        peak = max((value for day in report["heatmap"] for value in day if value), default=0)
+        rows = []
+        for day, values in zip(("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"), report["heatmap"]):
+            cells = "".join(
+                "·" if value is None else blocks[round(value / peak * 8) if peak else 0] for value in values
+            )
+            rows.append(f"{day} {cells}")
+        embed.add_field(
+            name="Average Live Channels by Hour (UTC)",
+            value="```\n    0     6     12    18\n" + "\n".join(rows) + "\n```",
+            inline=False
+        )
+        embed.set_footer(text=f"{report['samples']} samples since")
+        embed.timestamp = datetime.fromtimestamp(report["since"], timezone.utc)
+        await ctx.send(embed=embed)
+
     @autovoiceset.command()
     async def wipe(self, ctx):
         """Wipe all settings for this guild."""
+        state = self.guild_states.get(ctx.guild.id)
+        if state:
+            state.pool_size = 0
+            await self.trim_pools()
         await self.config.guild(ctx.guild).clear()
-        self.created_channels.clear()
+        self.guild_states.pop(ctx.guild.id, None)
+        self.dirty_guilds.discard(ctx.guild.id)
+        self.usage_tracker.forget(ctx.guild.id)
         await ctx.send("All AutoVoice settings for this guild have been wiped.")
 
     @commands.group(name="autovoice", aliases=["av"], invoke_without_command=True)
@@ -147,8 +508,8 @@ class AutoVoice(commands.Cog):
         """Lock your personal voice channel."""
         if await self.is_channel_owner(ctx):
             user_channel = ctx.author.voice.channel
-            await user_channel.set_permissions(ctx.guild.default_role, connect=False)
-            await ctx.send(f"{user_channel.name} is now locked.")
+            delay = self.editor.submit(user_channel, overwrites={ctx.guild.default_role: discord.PermissionOverwrite(connect=False)})
+            await ctx.send(f"{user_channel.name} will be locked {self.format_delay(delay)}.")
         else:
             await ctx.send("You are not the owner of this channel.")
 
@@ -157,8 +518,8 @@ class AutoVoice(commands.Cog):
         """Unlock your personal voice channel."""
         if await self.is_channel_owner(ctx):
             user_channel = ctx.author.voice.channel
-            await user_channel.set_permissions(ctx.guild.default_role, connect=True)
-            await ctx.send(f"{user_channel.name} is now unlocked.")
+            delay = self.editor.submit(user_channel, overwrites={ctx.guild.default_role: discord.PermissionOverwrite(connect=True)})
+            await ctx.send(f"{user_channel.name} will be unlocked {self.format_delay(delay)}.")
         else:
             await ctx.send("You are not the owner of this channel.")
 
@@ -180,17 +541,20 @@ class AutoVoice(commands.Cog):
         """Set a user limit on your personal voice channel."""
         if await self.is_channel_owner(ctx):
             user_channel = ctx.author.voice.channel
-            await user_channel.edit(user_limit=limit)
-            await ctx.send(f"{user_channel.name} now has a limit of {limit} users.")
+            delay = self.editor.submit(user_channel, user_limit=limit)
+            await ctx.send(f"{user_channel.name} will have a limit of {limit} users {self.format_delay(delay)}.")
         else:
             await ctx.send("You are not the owner of this channel.")
 
     @autovoice.command()
     async def rename(self, ctx, *, name: str):
-        """Rename your personal voice channel. (Can cause rate limiting)"""
+        """Rename your personal voice channel.
+
+        Discord only allows two renames every ten minutes, so extra renames are delayed.
+        """
         if await self.is_channel_owner(ctx):
             user_channel = ctx.author.voice.channel
-            await user_channel.edit(name=name)
-            await ctx.send(f"Your channel has been renamed to {name}.")
+            delay = self.editor.submit(user_channel, name=name)
+            await ctx.send(f"Your channel will be renamed to {name} {self.format_delay(delay)}.")
         else:
             await ctx.send("You are not the owner of this channel.")
@@ -1,44 +1,123 @@
 import discord
 
+def member_channel(interaction):
+    return interaction.user.voice.channel if interaction.user.voice else None
+
 class ChannelControlView(discord.ui.View):
-    def __init__(self, bot, channel_id):
+    """Persistent control panel; registered once with the bot and shared by every guild."""
+
+    def __init__(self, cog):
         super().__init__(timeout=None)
-        self.bot = bot
-        self.channel_id = channel_id
+        self.cog = cog
+        self.add_item(LockChannelButton())
+        self.add_item(UnlockChannelButton())
+        self.add_item(LimitChannelButton())
+        self.add_item(RenameChannelButton())
+        self.add_item(KickMemberButton())
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        user_channel = interaction.user.voice.channel if interaction.user.voice else None
+        user_channel = member_channel(interaction)
         if not user_channel:
             await interaction.response.send_message("You are not in a voice channel.", ephemeral=True)
             return False
-        owner_id = await self.bot.get_cog('AutoVoice').get_channel_owner(interaction.guild, user_channel.id)
-        if interaction.user.id != owner_id:
+        state = self.cog.guild_states.get(interaction.guild.id)
+        if state is None or state.owner_of(user_channel.id) != interaction.user.id:
             await interaction.response.send_message("You are not the owner of this channel.", ephemeral=True)
             return False
         return True
 
 class LockChannelButton(discord.ui.Button):
-    def __init__(self, bot):
-        super().__init__(style=discord.ButtonStyle.danger, label="Lock Channel")
-        self.bot = bot
+    def __init__(self):
+        super().__init__(style=discord.ButtonStyle.danger, label="Lock Channel", custom_id="autovoice:lock")
 
     async def callback(self, interaction: discord.Interaction):
-        user_channel = interaction.user.voice.channel if interaction.user.voice else None
-        if user_channel:
-            await user_channel.set_permissions(interaction.guild.default_role, connect=False)
-            await interaction.response.send_message(f"{user_channel.name} is now locked.", ephemeral=True)
-        else:
-            await interaction.response.send_message("You are not in a voice channel.", ephemeral=True)
+        cog = self.view.cog
+        user_channel = member_channel(interaction)
+        overwrite = discord.PermissionOverwrite(connect=False)
+        delay = cog.editor.submit(user_channel, overwrites={interaction.guild.default_role: overwrite})
+        await interaction.response.send_message(f"{user_channel.name} will be locked {cog.format_delay(delay)}.", ephemeral=True)
 
 class UnlockChannelButton(discord.ui.Button):
-    def __init__(self, bot):
-        super().__init__(style=discord.ButtonStyle.success, label="Unlock Channel")
-        self.bot = bot
+    def __init__(self):
+        super().__init__(style=discord.ButtonStyle.success, label="Unlock Channel", custom_id="autovoice:unlock")
+
+    async def callback(self, interaction: discord.Interaction):
+        cog = self.view.cog
+        user_channel = member_channel(interaction)
+        overwrite = discord.PermissionOverwrite(connect=True)
+        delay = cog.editor.submit(user_channel, overwrites={interaction.guild.default_role: overwrite})
+        await interaction.response.send_message(f"{user_channel.name} will be unlocked {cog.format_delay(delay)}.", ephemeral=True)
+
+class LimitChannelButton(discord.ui.Button):
+    def __init__(self):
+        super().__init__(style=discord.ButtonStyle.secondary, label="Set Limit", custom_id="autovoice:limit")
+
+    async def callback(self, interaction: discord.Interaction):
+        await interaction.response.send_modal(LimitModal(self.view.cog, member_channel(interaction)))
+
+class RenameChannelButton(discord.ui.Button):
+    def __init__(self):
+        super().__init__(style=discord.ButtonStyle.secondary, label="Rename", custom_id="autovoice:rename")
 
     async def callback(self, interaction: discord.Interaction):
-        user_channel = interaction.user.voice.channel if interaction.user.voice else None
-        if user_channel:
-            await user_channel.set_permissions(interaction.guild.default_role, connect=True)
-            await interaction.response.send_message(f"{user_channel.name} is now unlocked.", ephemeral=True)
+        await interaction.response.send_modal(RenameModal(self.view.cog, member_channel(interaction)))
+
+class KickMemberButton(discord.ui.Button):
+    def __init__(self):
+        super().__init__(style=discord.ButtonStyle.secondary, label="Kick", custom_id="autovoice:kick")
+
+    async def callback(self, interaction: discord.Interaction):
+        user_channel = member_channel(interaction)
+        members = [member for member in user_channel.members if member != interaction.user]
+        if not members:
+            await interaction.response.send_message("There is nobody else in your channel.", ephemeral=True)
+            return
+        view = discord.ui.View(timeout=60)
+        view.add_item(KickMemberSelect(user_channel, members[:25]))
+        await interaction.response.send_message("Choose who to kick.", view=view, ephemeral=True)
+
+class KickMemberSelect(discord.ui.Select):
+    def __init__(self, channel, members):
+        self.channel = channel
+        options = [discord.SelectOption(label=member.display_name, value=str(member.id)) for member in members]
+        super().__init__(placeholder="Choose a member", options=options)
+
+    async def callback(self, interaction: discord.Interaction):
+        member = interaction.guild.get_member(int(self.values[0]))
+        if member and member in self.channel.members:
+            await member.move_to(None)
+            await interaction.response.edit_message(content=f"{member.display_name} has been kicked from {self.channel.name}.", view=None)
         else:
-            await interaction.response.send_message("You are not in a voice channel.", ephemeral=True)
+            await interaction.response.edit_message(content="That member is no longer in your channel.", view=None)
+
+class LimitModal(discord.ui.Modal, title="Set User Limit"):
+    limit = discord.ui.TextInput(label="User limit (0 for no limit)", max_length=2)
+
+    def __init__(self, cog, channel):
+        super().__init__()
+        self.cog = cog
+        self.channel = channel
+
+    async def on_submit(self, interaction: discord.Interaction):
+        if not self.limit.value.isdigit():
+            await interaction.response.send_message("The limit must be a number between 0 and 99.", ephemeral=True)
+            return
+        limit = int(self.limit.value)
+        delay = self.cog.editor.submit(self.channel, user_limit=limit)
+        await interaction.response.send_message(
+            f"{self.channel.name} will have a limit of {limit} users {self.cog.format_delay(delay)}.", ephemeral=True
+        )
+
+class RenameModal(discord.ui.Modal, title="Rename Channel"):
+    channel_name = discord.ui.TextInput(label="Channel name", max_length=100)
+
+    def __init__(self, cog, channel):
+        super().__init__()
+        self.cog = cog
+        self.channel = channel
+
+    async def on_submit(self, interaction: discord.Interaction):
+        delay = self.cog.editor.submit(self.channel, name=self.channel_name.value)
+        await interaction.response.send_message(
+            f"Your channel will be renamed to {self.channel_name.value} {self.cog.format_delay(delay)}.", ephemeral=True
+        )
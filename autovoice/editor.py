@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from collections import deque
+import discord
+
+class ChannelEditor:
+    """Coalesces name, user limit and overwrite changes into one ``channel.edit`` per channel.
+
+    Changes wait ``debounce`` seconds so rapid tweaks merge. Discord only allows
+    ``RENAME_LIMIT`` renames per ``RENAME_WINDOW`` seconds on a channel, so a pending
+    name waits for a free slot while the other changes are applied without it.
+    """
+
+    RENAME_LIMIT = 2
+    RENAME_WINDOW = 600
+
+    def __init__(self, debounce=1.5):
+        self.debounce = debounce
+        self.pending = {}
+        self.channels = {}
+        self.first_queued = {}
+        self.tasks = {}
+        self.renames = {}
+
+    def note_rename(self, channel_id, when=None):
+        history = self.renames.setdefault(channel_id, deque(maxlen=self.RENAME_LIMIT))
+        history.append(time.monotonic() if when is None else when)
+
+    def next_rename_at(self, channel_id):
+        history = self.renames.get(channel_id)
+        if not history or len(history) < self.RENAME_LIMIT:
+            return 0.0
+        return history[0] + self.RENAME_WINDOW
+
+    def submit(self, channel, name=None, user_limit=None, overwrites=None):
+        """Queue changes for ``channel`` and return the seconds until they are applied."""
+        now = time.monotonic()
+        changes = self.pending.setdefault(channel.id, {})
+        self.channels[channel.id] = channel
+        self.first_queued.setdefault(channel.id, now)
+        if name is not None:
+            changes["name"] = name
+        if user_limit is not None:
+            changes["user_limit"] = user_limit
+        if overwrites:
+            merged = changes.setdefault("overwrites", {})
+            for target, overwrite in overwrites.items():
+                current = merged.get(target, discord.PermissionOverwrite())
+                current.update(**{perm: value for perm, value in overwrite if value is not None})
+                merged[target] = current
+
+        if channel.id not in self.tasks:
+            self.tasks[channel.id] = asyncio.create_task(self.run(channel.id))
+
+        apply_at = self.first_queued[channel.id] + self.debounce
+        if name is not None:
+            apply_at = max(apply_at, self.next_rename_at(channel.id))
+        return max(0.0, apply_at - now)
+
+    def discard(self, channel_id, forget=False):
+        """Drop pending changes; ``forget`` also drops rename history for deleted channels."""
+        self.pending.pop(channel_id, None)
+        self.channels.pop(channel_id, None)
+        self.first_queued.pop(channel_id, None)
+        if forget:
+            self.renames.pop(channel_id, None)
+        task = self.tasks.pop(channel_id, None)
+        if task:
+            task.cancel()
+
+    async def run(self, channel_id):
+        try:
+            while self.pending.get(channel_id):
+                now = time.monotonic()
+                ready_at = self.first_queued[channel_id] + self.debounce
+                if now < ready_at:
+                    await asyncio.sleep(ready_at - now)
+                    continue
+
+                changes = self.pending[channel_id]
+                kwargs = {key: value for key, value in changes.items() if key != "name"}
+                rename_at = self.next_rename_at(channel_id)
+                if "name" in changes and now >= rename_at:
+                    kwargs["name"] = changes["name"]
+                if not kwargs:
+                    await asyncio.sleep(rename_at - now)
+                    continue
+
+                for key in kwargs:
+                    del changes[key]
+                if changes:
+                    self.first_queued[channel_id] = now
+                else:
+                    del self.pending[channel_id]
+                    self.first_queued.pop(channel_id, None)
+                await self.apply(self.channels[channel_id], kwargs)
+        finally:
+            self.tasks.pop(channel_id, None)
+            if channel_id not in self.pending:
+                self.channels.pop(channel_id, None)
+
+    async def apply(self, channel, kwargs):
+        if "overwrites" in kwargs:
+            overwrites = dict(channel.overwrites)
+            for target, overwrite in kwargs["overwrites"].items():
+                current = overwrites.get(target, discord.PermissionOverwrite())
+                current.update(**{perm: value for perm, value in overwrite if value is not None})
+                overwrites[target] = current
+            kwargs["overwrites"] = overwrites
+        try:
+            await channel.edit(**kwargs)
+            if "name" in kwargs:
+                self.note_rename(channel.id)
+        except discord.NotFound:
+            self.pending.pop(channel.id, None)
+            self.renames.pop(channel.id, None)
+        except discord.HTTPException as e:
+            logging.error(f"Failed to edit AutoVoice channel {channel.id}: {e}")
+
+    def cancel(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+        self.pending.clear()
+        self.channels.clear()
+        self.first_queued.clear()
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+class QueueStats:
+    __slots__ = ("processed", "deduped", "failed", "max_depth", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.processed = 0
+        self.deduped = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def average_wait(self):
+        return self.total_wait / self.processed if self.processed else 0.0
+
+class CreationScheduler:
+    """Runs channel creations one at a time per guild.
+
+    Each guild gets a FIFO queue drained by a single worker, paced by a token
+    bucket of ``burst`` calls refilling at ``rate`` per second. A member who is
+    already queued is not queued again.
+    """
+
+    def __init__(self, rate=1.0, burst=4):
+        self.rate = rate
+        self.burst = burst
+        self.queues = {}
+        self.workers = {}
+        self.pending = {}
+        self.buckets = {}
+        self.stats = {}
+
+    def depth(self, guild_id):
+        return len(self.queues.get(guild_id, ()))
+
+    def get_stats(self, guild_id):
+        stats = self.stats.get(guild_id)
+        if stats is None:
+            stats = self.stats[guild_id] = QueueStats()
+        return stats
+
+    def submit(self, guild_id, member_id, job):
+        """Queue ``job`` (a coroutine function) for a member and return its future."""
+        key = (guild_id, member_id)
+        stats = self.get_stats(guild_id)
+        if key in self.pending:
+            stats.deduped += 1
+            return self.pending[key]
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        queue = self.queues.setdefault(guild_id, deque())
+        queue.append((key, job, time.monotonic(), future))
+        stats.max_depth = max(stats.max_depth, len(queue))
+        if guild_id not in self.workers:
+            self.workers[guild_id] = asyncio.create_task(self.run(guild_id))
+        return future
+
+    async def throttle(self, guild_id):
+        now = time.monotonic()
+        tokens, last = self.buckets.get(guild_id, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            await asyncio.sleep((1 - tokens) / self.rate)
+            now = time.monotonic()
+            tokens = 1
+        self.buckets[guild_id] = (tokens - 1, now)
+
+    async def run(self, guild_id):
+        queue = self.queues[guild_id]
+        stats = self.get_stats(guild_id)
+        try:
+            while queue:
+                key, job, queued_at, future = queue[0]
+                await self.throttle(guild_id)
+                queue.popleft()
+                wait = time.monotonic() - queued_at
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+                stats.processed += 1
+                try:
+                    result = await job()
+                except Exception as e:
+                    stats.failed += 1
+                    result = None
+                    logging.error(f"AutoVoice channel creation failed in guild {guild_id}: {e}")
+                finally:
+                    self.pending.pop(key, None)
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.workers.pop(guild_id, None)
+            if not queue:
+                self.queues.pop(guild_id, None)
+
+    def cancel(self):
+        for worker in self.workers.values():
+            worker.cancel()
+        for future in self.pending.values():
+            future.cancel()
+        self.workers.clear()
+        self.pending.clear()
+        self.queues.clear()
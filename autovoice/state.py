@@ -0,0 +1,71 @@
+import time
+
+class GuildState:
+    """In-memory copy of a guild's AutoVoice settings and channel owners.
+
+    ``channel_owners`` maps channel ID to owner ID and ``owner_channels`` is the
+    reverse map, so both directions are plain dict lookups. ``pool`` maps idle
+    pooled channel IDs to the time they were returned.
+    """
+
+    __slots__ = (
+        "trigger_channel_id",
+        "control_channel_id",
+        "control_message_id",
+        "control_view_version",
+        "channel_owners",
+        "owner_channels",
+        "pool_size",
+        "pool",
+        "grace_period",
+    )
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.trigger_channel_id = data.get("trigger_channel_id")
+        self.control_channel_id = data.get("control_channel_id")
+        self.control_message_id = data.get("control_message_id")
+        self.control_view_version = data.get("control_view_version", 0)
+        self.channel_owners = {}
+        self.owner_channels = {}
+        for channel_id, owner_id in (data.get("channel_owners") or {}).items():
+            self.set_owner(int(channel_id), owner_id)
+        self.pool_size = data.get("pool_size", 0)
+        self.grace_period = data.get("grace_period", 0)
+        now = time.time()
+        self.pool = {channel_id: now for channel_id in data.get("pool_channels") or []}
+
+    def owner_of(self, channel_id):
+        return self.channel_owners.get(channel_id)
+
+    def channel_of(self, member_id):
+        return self.owner_channels.get(member_id)
+
+    def set_owner(self, channel_id, member_id):
+        self.remove_channel(channel_id)
+        self.channel_owners[channel_id] = member_id
+        self.owner_channels[member_id] = channel_id
+
+    def remove_channel(self, channel_id):
+        owner_id = self.channel_owners.pop(channel_id, None)
+        if owner_id is not None and self.owner_channels.get(owner_id) == channel_id:
+            del self.owner_channels[owner_id]
+        return owner_id
+
+    def owners_to_config(self):
+        return {str(channel_id): owner_id for channel_id, owner_id in self.channel_owners.items()}
+
+    def take_idle(self, usable=None):
+        """Pop the channel that has been idle the longest, spreading renames across the pool.
+
+        ``usable`` can filter out channels that cannot be handed out right now.
+        """
+        candidates = [channel_id for channel_id in self.pool if usable is None or usable(channel_id)]
+        if not candidates:
+            return None
+        channel_id = min(candidates, key=self.pool.get)
+        del self.pool[channel_id]
+        return channel_id
+
+    def pool_to_config(self):
+        return list(self.pool)
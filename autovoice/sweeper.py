@@ -0,0 +1,78 @@
+import asyncio
+import heapq
+import logging
+import time
+
+class ChannelSweeper:
+    """One background task that expires empty channels after their grace period.
+
+    Deadlines are kept in a heap; cancelled or rescheduled entries stay in the heap
+    and are skipped when popped. Expired channels are handed to ``expire`` in
+    batches of up to ``batch_size``.
+    """
+
+    def __init__(self, expire, batch_size=10):
+        self.expire = expire
+        self.batch_size = batch_size
+        self.heap = []
+        self.deadlines = {}
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def __contains__(self, channel_id):
+        return channel_id in self.deadlines
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def schedule(self, channel, delay):
+        deadline = time.monotonic() + delay
+        self.deadlines[channel.id] = deadline
+        heapq.heappush(self.heap, (deadline, channel.id, channel.guild.id))
+        if self.heap[0][1] == channel.id:
+            self.wakeup.set()
+
+    def cancel(self, channel_id):
+        return self.deadlines.pop(channel_id, None) is not None
+
+    def pop_expired(self, now):
+        batch = []
+        while self.heap and self.heap[0][0] <= now and len(batch) < self.batch_size:
+            deadline, channel_id, guild_id = heapq.heappop(self.heap)
+            if self.deadlines.get(channel_id) == deadline:
+                del self.deadlines[channel_id]
+                batch.append((guild_id, channel_id))
+        return batch
+
+    async def run(self):
+        while True:
+            if not self.heap:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+
+            delay = self.heap[0][0] - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                continue
+
+            batch = self.pop_expired(time.monotonic())
+            results = await asyncio.gather(
+                *(self.expire(guild_id, channel_id) for guild_id, channel_id in batch), return_exceptions=True
+            )
+            for (guild_id, channel_id), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logging.error(f"Failed to clean up AutoVoice channel {channel_id} in guild {guild_id}: {result}")
@@ -0,0 +1,276 @@
+"""Offline voice-storm benchmark for AutoVoice.
+
+Replays synthetic join/leave storms through ``AutoVoice.on_voice_state_update``
+against fake guilds, members and channels. Discord HTTP calls and Config are
+replaced with counting stand-ins, so nothing touches the network or disk
+(apart from a temporary data directory).
+
+Run from the repository root with Red-DiscordBot installed:
+
+    python benchmarks/autovoice_storm.py --members 500 --events 5000 --rate 200
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import autovoice.autovoice as autovoice_module
+from benchmarks.common import FakeConfig, percentile
+
+ids = itertools.count(10_000)
+
+class Stats:
+    def __init__(self):
+        self.api = Counter()
+        self.latencies = []
+        self.duplicates = 0
+
+class FakeHTTP:
+    def __init__(self, stats, latency):
+        self.stats = stats
+        self.latency = latency
+
+    async def call(self, route):
+        self.stats.api[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+
+class FakeRole:
+    def __init__(self):
+        self.id = next(ids)
+
+class FakeVoiceState:
+    def __init__(self, channel):
+        self.channel = channel
+
+class FakeVoiceChannel:
+    def __init__(self, guild, name, category=None, overwrites=None):
+        self.id = next(ids)
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.overwrites = dict(overwrites or {})
+        self.user_limit = 0
+        self.members = []
+
+    async def edit(self, name=None, user_limit=None, overwrites=None, sync_permissions=False):
+        await self.guild.http.call("edit_channel")
+        if name is not None:
+            self.name = name
+        if user_limit is not None:
+            self.user_limit = user_limit
+        if overwrites is not None:
+            self.overwrites = dict(overwrites)
+        if sync_permissions:
+            self.overwrites = {}
+
+    async def delete(self):
+        await self.guild.http.call("delete_channel")
+        self.guild.channels.pop(self.id, None)
+
+class FakeMember:
+    def __init__(self, bench, guild, index):
+        self.bench = bench
+        self.id = next(ids)
+        self.guild = guild
+        self.display_name = f"member{index}"
+        self.channel = None
+
+    @property
+    def voice(self):
+        return FakeVoiceState(self.channel) if self.channel else None
+
+    def place(self, channel):
+        """Change the member's voice channel and emit the gateway event."""
+        before = FakeVoiceState(self.channel)
+        if self.channel:
+            self.channel.members.remove(self)
+        self.channel = channel
+        if channel:
+            channel.members.append(self)
+        self.bench.dispatch(self, before, FakeVoiceState(channel))
+
+    async def move_to(self, channel):
+        await self.guild.http.call("move_member")
+        if channel is not None and channel.id not in self.guild.channels:
+            return
+        self.place(channel)
+
+class FakeGuild:
+    def __init__(self, bench, member_count):
+        self.id = next(ids)
+        self.http = bench.http
+        self.stats = bench.stats
+        self.default_role = FakeRole()
+        self.channels = {}
+        self.trigger = FakeVoiceChannel(self, "Join to Create")
+        self.channels[self.trigger.id] = self.trigger
+        self.members = [FakeMember(bench, self, index) for index in range(member_count)]
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    async def create_voice_channel(self, name, category=None, overwrites=None):
+        await self.http.call("create_channel")
+        if any(channel.name == name and channel.members for channel in self.channels.values()):
+            self.stats.duplicates += 1
+        channel = FakeVoiceChannel(self, name, category, overwrites)
+        self.channels[channel.id] = channel
+        return channel
+
+class FakeBot:
+    def __init__(self, guilds):
+        self.guilds = guilds
+        self.user = None
+
+    def get_guild(self, guild_id):
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+    def get_channel(self, channel_id):
+        for guild in self.guilds:
+            channel = guild.get_channel(channel_id)
+            if channel:
+                return channel
+        return None
+
+    def add_view(self, view, message_id=None):
+        pass
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.stats = Stats()
+        self.http = FakeHTTP(self.stats, args.api_latency)
+        self.tasks = set()
+        self.cog = None
+        self.warmed = 0
+
+    def dispatch(self, member, before, after):
+        task = asyncio.create_task(self.handle(member, before, after))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def handle(self, member, before, after):
+        start = time.perf_counter()
+        await self.cog.on_voice_state_update(member, before, after)
+        self.stats.latencies.append(time.perf_counter() - start)
+
+    async def storm(self, guilds):
+        members = [member for guild in guilds for member in guild.members]
+        delay = 1 / self.args.rate
+        for _ in range(self.args.events):
+            member = random.choice(members)
+            roll = random.random()
+            if member.channel is None:
+                member.place(member.guild.trigger)
+            elif roll < 0.15:
+                member.place(member.guild.trigger)
+            elif roll < 0.3 and member.channel is not member.guild.trigger:
+                channel = member.channel
+                member.place(None)
+                asyncio.get_running_loop().call_later(random.uniform(0.05, 0.5), self.rejoin, member, channel)
+            else:
+                member.place(None)
+            await asyncio.sleep(delay)
+
+    def rejoin(self, member, channel):
+        if member.channel is None and channel.id in member.guild.channels:
+            member.place(channel)
+
+    async def settle(self):
+        deadline = time.monotonic() + self.args.settle
+        while time.monotonic() < deadline:
+            busy = self.tasks or self.cog.creation_queue.workers or self.cog.sweeper.deadlines
+            if not busy:
+                break
+            await asyncio.sleep(0.05)
+
+    async def run(self):
+        with tempfile.TemporaryDirectory() as data_dir, \
+                mock.patch.object(autovoice_module.Config, "get_conf", lambda *a, **k: FakeConfig()), \
+                mock.patch.object(autovoice_module, "cog_data_path", lambda cog: Path(data_dir)):
+            guilds = [FakeGuild(self, self.args.members) for _ in range(self.args.guilds)]
+            bot = FakeBot(guilds)
+            self.cog = cog = autovoice_module.AutoVoice(bot)
+            cog.creation_queue.rate = self.args.create_rate
+            cog.creation_queue.burst = max(1, int(self.args.create_rate))
+            for guild in guilds:
+                await cog.config.guild(guild).trigger_channel_id.set(guild.trigger.id)
+                await cog.config.guild(guild).pool_size.set(self.args.pool)
+                await cog.config.guild(guild).grace_period.set(self.args.grace)
+            await cog.cog_load()
+            for guild in guilds:
+                cog.schedule_pool_refill(guild)
+            await self.settle()
+            self.warmed = min((len(cog.guild_states[guild.id].pool) for guild in guilds), default=0)
+            self.stats.api.clear()
+            cog.config.reads = cog.config.writes = 0
+
+            started = time.perf_counter()
+            await self.storm(guilds)
+            storm_time = time.perf_counter() - started
+            await self.settle()
+            await cog.flush_owners()
+            self.report(guilds, storm_time)
+            await cog.cog_unload()
+
+    def report(self, guilds, storm_time):
+        stats = self.stats
+        latencies = sorted(stats.latencies)
+        leaked = orphaned = 0
+        for guild in guilds:
+            state = self.cog.guild_states[guild.id]
+            for channel in guild.channels.values():
+                if channel is guild.trigger or channel.id in state.pool:
+                    continue
+                if channel.id not in state.channel_owners:
+                    orphaned += 1
+                elif not channel.members and channel.id not in self.cog.sweeper:
+                    leaked += 1
+        queue_stats = [self.cog.creation_queue.get_stats(guild.id) for guild in guilds]
+
+        print(f"events replayed      {self.args.events} in {storm_time:.2f}s across {len(guilds)} guild(s)")
+        print(f"handler calls        {len(latencies)}")
+        for p in (50, 95, 99):
+            print(f"handler p{p:<2}         {percentile(latencies, p) * 1000:.3f} ms" if latencies else f"handler p{p:<2}         n/a")
+        print(f"handler max          {latencies[-1] * 1000:.3f} ms" if latencies else "handler max          n/a")
+        print(f"API calls            {sum(stats.api.values())} {dict(stats.api)}")
+        print(f"Config reads/writes  {self.cog.config.reads}/{self.cog.config.writes}")
+        print(f"creation queue       max depth {max(s.max_depth for s in queue_stats)}, "
+              f"max wait {max(s.max_wait for s in queue_stats):.2f}s, "
+              f"deduped {sum(s.deduped for s in queue_stats)}")
+        print(f"duplicate channels   {stats.duplicates}")
+        print(f"leaked channels      {leaked} empty, {orphaned} unowned")
+        if self.args.pool:
+            pooled = min(len(self.cog.guild_states[guild.id].pool) for guild in guilds)
+            status = "ok" if self.warmed >= self.args.pool and pooled >= self.args.pool else "NOT FILLED"
+            print(f"pool channels        {self.warmed}/{self.args.pool} after warm-up, "
+                  f"{pooled}/{self.args.pool} after settling ({status})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=1)
+    parser.add_argument("--members", type=int, default=200, help="members per guild")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=100, help="voice events per second")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="mean fake HTTP latency in seconds")
+    parser.add_argument("--create-rate", type=float, default=20, help="channel creations per second per guild")
+    parser.add_argument("--pool", type=int, default=0)
+    parser.add_argument("--grace", type=int, default=0)
+    parser.add_argument("--settle", type=float, default=30, help="seconds to wait for queues to drain")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(Bench(args).run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Stand-ins shared by the offline benchmarks.
+
+``FakeConfig`` mimics the parts of Red's ``Config`` the cogs use, keeping
+everything in memory and counting reads and writes.
+"""
+import copy
+import math
+
+def percentile(values, p):
+    """Nearest-rank percentile of already sorted ``values``, or None if empty."""
+    if not values:
+        return None
+    index = max(0, math.ceil(p / 100 * len(values)) - 1)
+    return values[index]
+
+class FakeValue:
+    def __init__(self, group, key):
+        self.group = group
+        self.key = key
+
+    async def _get(self):
+        self.group.config.reads += 1
+        return copy.deepcopy(self.group.data.get(self.key, self.group.defaults[self.key]))
+
+    def __call__(self):
+        return self._get()
+
+    async def set(self, value):
+        self.group.config.writes += 1
+        self.group.data[self.key] = copy.deepcopy(value)
+
+    async def clear(self):
+        self.group.config.writes += 1
+        self.group.data.pop(self.key, None)
+
+class FakeGroup:
+    def __init__(self, config, data, defaults):
+        self.config = config
+        self.data = data
+        self.defaults = defaults
+
+    def __getattr__(self, key):
+        return FakeValue(self, key)
+
+    async def clear(self):
+        self.config.writes += 1
+        self.data.clear()
+
+class FakeConfig:
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.guild_defaults = {}
+        self.global_defaults = {}
+        self.guilds = {}
+        self.globals = FakeGroup(self, {}, self.global_defaults)
+
+    def register_guild(self, **defaults):
+        self.guild_defaults.update(defaults)
+
+    def register_global(self, **defaults):
+        self.global_defaults.update(defaults)
+
+    def guild(self, guild):
+        return self.guild_from_id(guild.id)
+
+    def guild_from_id(self, guild_id):
+        return FakeGroup(self, self.guilds.setdefault(guild_id, {}), self.guild_defaults)
+
+    def __getattr__(self, key):
+        if key.startswith("__"):
+            raise AttributeError(key)
+        return FakeValue(self.globals, key)
+
+    async def all_guilds(self):
+        self.reads += 1
+        return {
+            guild_id: {**copy.deepcopy(self.guild_defaults), **copy.deepcopy(data)}
+            for guild_id, data in self.guilds.items()
+        }
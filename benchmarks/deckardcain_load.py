@@ -0,0 +1,325 @@
+"""Offline load benchmark for DeckardCain.
+
+Starts a local OpenAI-compatible completions server with configurable latency,
+streaming speed and error injection, points the cog's client pool at it and
+drives ``generate_response``, ``askcain`` and the ``on_message`` listener with
+concurrent questions. Config and Discord objects are replaced with in-memory
+stand-ins, so nothing leaves the machine and no API key is spent.
+
+Run from the repository root with Red-DiscordBot and aiohttp installed:
+
+    python benchmarks/deckardcain_load.py --requests 2000 --concurrency 50 --stream
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deckardcain.deckardcain as deckardcain_module
+from deckardcain.clients import ClientPool
+from benchmarks.common import FakeConfig, percentile
+
+ids = itertools.count(10_000)
+API_KEY = "sk-benchmark"
+BUSY_PREFIX = "`Deckard Cain` is busy"
+TOPICS = ["Tristram", "the Horadrim", "Baal", "the Worldstone", "Diablo", "Mephisto", "Andariel", "Cow Level"]
+
+class MockCompletions:
+    """A tiny ``/v1/completions`` endpoint that answers with filler words."""
+
+    def __init__(self, args):
+        self.latency = args.latency
+        self.token_latency = args.token_latency
+        self.tokens = args.tokens
+        self.error_rate = args.error_rate
+        self.stats = Counter()
+        self.runner = None
+        self.base_url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/completions", self.completions)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def payload(self, model, text, finish_reason):
+        return {
+            "id": f"cmpl-{next(ids)}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"text": text, "index": 0, "logprobs": None, "finish_reason": finish_reason}],
+        }
+
+    async def completions(self, request):
+        body = await request.json()
+        self.stats["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(random.expovariate(1 / self.latency))
+        if random.random() < self.error_rate:
+            status = random.choice((429, 500, 503))
+            self.stats[f"injected {status}"] += 1
+            return web.json_response(
+                {"error": {"message": "Injected failure", "type": "server_error", "param": None, "code": None}},
+                status=status,
+            )
+
+        words = [f" word{index}" for index in range(self.tokens)]
+        model = body.get("model", "mock")
+        if not body.get("stream"):
+            self.stats["completed"] += 1
+            await asyncio.sleep(self.token_latency * self.tokens)
+            response = self.payload(model, "".join(words), "stop")
+            response["usage"] = {"prompt_tokens": len(body.get("prompt", "")) // 4, "completion_tokens": self.tokens, "total_tokens": 0}
+            return web.json_response(response)
+
+        self.stats["streamed"] += 1
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        for index, word in enumerate(words):
+            finish_reason = "stop" if index == len(words) - 1 else None
+            await response.write(f"data: {json.dumps(self.payload(model, word, finish_reason))}\n\n".encode())
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+class FakeMessage:
+    def __init__(self, channel, content, author=None, guild=None):
+        self.id = next(ids)
+        self.channel = channel
+        self.content = content
+        self.author = author
+        self.guild = guild
+        self.edits = 0
+
+    async def edit(self, content=None):
+        self.edits += 1
+        self.channel.bench.stats["edits"] += 1
+        self.content = content
+
+    async def delete(self):
+        pass
+
+class FakeChannel:
+    """One request's view of a text channel; it records when the first answer text arrived."""
+
+    def __init__(self, bench, channel_id, started):
+        self.bench = bench
+        self.id = channel_id
+        self.started = started
+        self.first_text = None
+        self.messages = []
+
+    async def send(self, content=None, **kwargs):
+        message = FakeMessage(self, content)
+        if content and content.startswith(BUSY_PREFIX):
+            self.bench.stats["queue notices"] += 1
+        else:
+            if self.first_text is None:
+                self.first_text = time.perf_counter()
+            self.messages.append(message)
+        return message
+
+    @property
+    def mention(self):
+        return f"<#{self.id}>"
+
+class FakeMember:
+    def __init__(self):
+        self.id = next(ids)
+        self.bot = False
+
+class FakeGuild:
+    def __init__(self):
+        self.id = next(ids)
+        self.allowed_channel_id = next(ids)
+
+class FakeContext:
+    def __init__(self, guild, channel, author):
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+class FakeBot:
+    def __init__(self):
+        self.user = FakeMember()
+
+    def get_channel(self, channel_id):
+        return None
+
+class Result:
+    def __init__(self, path, latency, ttft, error, messages):
+        self.path = path
+        self.latency = latency
+        self.ttft = ttft
+        self.error = error
+        self.messages = messages
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.stats = Counter()
+        self.server = MockCompletions(args)
+        self.results = []
+        self.noise_latencies = []
+        self.repeat_pool = [self.question(index) for index in range(max(1, args.repeat_pool))]
+        self.cog = None
+
+    def question(self, index):
+        return f"What do you know about {random.choice(TOPICS)}? ({index})"
+
+    def next_question(self, index):
+        if random.random() < self.args.repeat:
+            return random.choice(self.repeat_pool)
+        return self.question(index)
+
+    async def ask(self, path, guild, member, question):
+        started = time.perf_counter()
+        channel = FakeChannel(self, guild.allowed_channel_id, started)
+        if path == "generate_response":
+            answer = await self.cog.generate_response(question, API_KEY)
+            await channel.send(answer)
+        elif path == "askcain":
+            ctx = FakeContext(guild, channel, member)
+            await self.cog.askcain.callback(self.cog, ctx, question=question)
+        else:
+            await self.cog.on_message(FakeMessage(channel, question, member, guild))
+        latency = time.perf_counter() - started
+        texts = [message.content or "" for message in channel.messages]
+        error = any("An error occurred" in text for text in texts)
+        if any("enough questions for today" in text for text in texts):
+            self.stats["budget rejections"] += 1
+        ttft = channel.first_text - started if channel.first_text else None
+        return Result(path, latency, ttft, error, len(channel.messages))
+
+    async def noise(self, guild, member):
+        """Messages in channels Cain does not watch; these should cost a set lookup."""
+        channel = FakeChannel(self, next(ids), time.perf_counter())
+        message = FakeMessage(channel, "just chatting", member, guild)
+        started = time.perf_counter()
+        await self.cog.on_message(message)
+        self.noise_latencies.append(time.perf_counter() - started)
+
+    async def worker(self, counter, guilds, members):
+        while True:
+            index = next(counter)
+            if index >= self.args.requests:
+                return
+            guild = random.choice(guilds)
+            member = random.choice(members)
+            for _ in range(self.args.noise):
+                await self.noise(guild, member)
+            path = random.choice(self.args.paths)
+            self.results.append(await self.ask(path, guild, member, self.next_question(index)))
+
+    async def run(self):
+        await self.server.start()
+        with tempfile.TemporaryDirectory() as data_dir, \
+                mock.patch.object(deckardcain_module.Config, "get_conf", lambda *a, **k: FakeConfig()), \
+                mock.patch.object(deckardcain_module, "cog_data_path", lambda cog: Path(data_dir)):
+            self.cog = cog = deckardcain_module.DeckardCain(FakeBot())
+            cog.clients = ClientPool(base_url=self.server.base_url)
+            guilds = [FakeGuild() for _ in range(self.args.guilds)]
+            members = [FakeMember() for _ in range(self.args.members)]
+            await cog.config.persist_cache.set(False)
+            for guild in guilds:
+                guild_config = cog.config.guild(guild)
+                await guild_config.api_key.set(API_KEY)
+                await guild_config.allowed_channel.set(guild.allowed_channel_id)
+                await guild_config.stream.set(self.args.stream)
+                await guild_config.memory.set(self.args.memory)
+                await guild_config.concurrency.set(self.args.guild_concurrency)
+                await guild_config.requests_per_minute.set(self.args.rpm)
+                await guild_config.daily_tokens.set(self.args.daily_tokens)
+            await cog.cog_load()
+            cog.scheduler.max_concurrency = self.args.max_concurrency
+
+            counter = itertools.count()
+            started = time.perf_counter()
+            await asyncio.gather(*(self.worker(counter, guilds, members) for _ in range(self.args.concurrency)))
+            elapsed = time.perf_counter() - started
+            await cog.cog_unload()
+        await self.server.stop()
+        self.report(elapsed)
+
+    def report(self, elapsed):
+        results = self.results
+        print(f"questions            {len(results)} in {elapsed:.2f}s "
+              f"({len(results) / elapsed:.1f}/s) with {self.args.concurrency} concurrent askers")
+        print(f"mode                 {'streamed' if self.args.stream else 'complete'} answers, "
+              f"memory {self.args.memory}, {self.args.guilds} guild(s)")
+        for path in ["all"] + sorted(set(result.path for result in results)):
+            selected = [result for result in results if path == "all" or result.path == path]
+            latencies = sorted(result.latency for result in selected)
+            ttfts = sorted(result.ttft for result in selected if result.ttft is not None)
+            errors = sum(result.error for result in selected)
+            print(f"\n[{path}] {len(selected)} questions, {errors} answered with an error")
+            for p in (50, 95, 99):
+                latency = percentile(latencies, p) * 1000 if latencies else float("nan")
+                ttft = percentile(ttfts, p) * 1000 if ttfts else float("nan")
+                print(f"  p{p:<2}  latency {latency:9.1f} ms   first text {ttft:9.1f} ms")
+        if self.noise_latencies:
+            noise = sorted(self.noise_latencies)
+            print(f"\nignored messages     {len(noise)}, p50 {percentile(noise, 50) * 1e6:.1f} us, "
+                  f"p99 {percentile(noise, 99) * 1e6:.1f} us")
+        cache = self.cog.cache
+        print(f"\nmock server          {dict(self.server.stats)}")
+        print(f"answer cache         {cache.hits} hits, {cache.misses} misses, {cache.coalesced} coalesced")
+        print(f"discord side         {dict(self.stats)}")
+        budgets = self.cog.scheduler.budgets.values()
+        print(f"budgets              {sum(b.requests for b in budgets)} admitted, "
+              f"{sum(b.rejected for b in budgets)} rejected, peak queue {max((b.peak_queue for b in budgets), default=0)}, "
+              f"{sum(b.tokens_total for b in budgets)} tokens")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20, help="simultaneous askers")
+    parser.add_argument("--paths", nargs="+", default=["generate_response", "askcain", "on_message"],
+                        choices=["generate_response", "askcain", "on_message"])
+    parser.add_argument("--guilds", type=int, default=4)
+    parser.add_argument("--members", type=int, default=100)
+    parser.add_argument("--stream", action="store_true", help="stream answers instead of sending them whole")
+    parser.add_argument("--memory", choices=["off", "channel", "user"], default="off")
+    parser.add_argument("--latency", type=float, default=0.2, help="mean seconds before the mock starts answering")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="seconds between generated words")
+    parser.add_argument("--tokens", type=int, default=80, help="words per answer")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fraction of mock requests that fail")
+    parser.add_argument("--repeat", type=float, default=0.1, help="fraction of questions drawn from a small repeated pool")
+    parser.add_argument("--repeat-pool", type=int, default=10)
+    parser.add_argument("--noise", type=int, default=5, help="ignored channel messages per question")
+    parser.add_argument("--guild-concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute per guild, 0 for unlimited")
+    parser.add_argument("--daily-tokens", type=int, default=0, help="daily token budget per guild, 0 for unlimited")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="requests in flight across all guilds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(Bench(args).run())
+
+if __name__ == "__main__":
+    main()
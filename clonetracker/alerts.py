@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import discord
+
+def progress_of(entries):
+    if not entries:
+        return None
+    try:
+        return int(entries[0]["progress"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def diff_snapshots(old, new):
+    """Return ``{combo: (old_progress, new_progress)}`` for every combination that changed."""
+    if old is None:
+        return {}
+    changes = {}
+    for combo, entries in new.progress.items():
+        before = progress_of(old.progress.get(combo))
+        after = progress_of(entries)
+        if after is not None and before is not None and before != after:
+            changes[combo] = (before, after)
+    return changes
+
+class AlertDispatcher:
+    """Fans progress changes out to subscribed channels.
+
+    ``subscribers`` indexes channel IDs by combination so a change only touches the
+    channels that asked for it. Each channel gets at most one message per poll, and
+    never the same progress twice in a row for a combination. Sends run
+    ``concurrency`` at a time and are paced to about ``rate`` messages per second.
+    """
+
+    def __init__(self, bot, concurrency=5, rate=10):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.rate = rate
+        self.subscriptions = {}
+        self.subscribers = {}
+        self.last_alerted = {}
+
+    def load(self, all_guilds):
+        self.subscriptions.clear()
+        self.subscribers.clear()
+        for data in all_guilds.values():
+            for channel_id, subscription in data.get("alerts", {}).items():
+                self.subscribe(int(channel_id), subscription)
+
+    def subscribe(self, channel_id, subscription):
+        self.unsubscribe(channel_id)
+        self.subscriptions[channel_id] = subscription
+        for combo in subscription["combos"]:
+            self.subscribers.setdefault(tuple(combo), set()).add(channel_id)
+
+    def unsubscribe(self, channel_id):
+        subscription = self.subscriptions.pop(channel_id, None)
+        if subscription is None:
+            return
+        for combo in subscription["combos"]:
+            channels = self.subscribers.get(tuple(combo))
+            if channels:
+                channels.discard(channel_id)
+                if not channels:
+                    del self.subscribers[tuple(combo)]
+        for key in [key for key in self.last_alerted if key[0] == channel_id]:
+            del self.last_alerted[key]
+
+    def collect(self, changes):
+        """Group changes per channel, dropping duplicates and changes below the threshold."""
+        batches = {}
+        for combo, (before, after) in changes.items():
+            for channel_id in self.subscribers.get(combo, ()):
+                subscription = self.subscriptions[channel_id]
+                if after < subscription["threshold"]:
+                    continue
+                if self.last_alerted.get((channel_id, combo)) == after:
+                    continue
+                self.last_alerted[(channel_id, combo)] = after
+                batches.setdefault(channel_id, []).append((combo, before, after))
+        return batches
+
+    async def dispatch(self, changes):
+        batches = self.collect(changes)
+        if not batches:
+            return 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self.send(semaphore, channel_id, updates) for channel_id, updates in batches.items())
+        )
+        return sum(results)
+
+    async def send(self, semaphore, channel_id, updates):
+        async with semaphore:
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                return 0
+            role_id = self.subscriptions.get(channel_id, {}).get("role_id")
+            lines = ["**Uber Diablo progress update**"]
+            for (region, ladder, hardcore), before, after in sorted(updates):
+                lines.append(
+                    f"[{after}/6] - {region.capitalize()} - {ladder.capitalize()} - {hardcore.capitalize()} (was {before}/6)"
+                )
+            if role_id:
+                lines.insert(0, f"<@&{role_id}>")
+            try:
+                await channel.send(
+                    "\n".join(lines), allowed_mentions=discord.AllowedMentions(roles=True, users=False, everyone=False)
+                )
+                return 1
+            except discord.HTTPException as e:
+                logging.error(f"Failed to send CloneTracker alert to channel {channel_id}: {e}")
+                return 0
+            finally:
+                await asyncio.sleep(self.concurrency / self.rate)
@@ -0,0 +1,132 @@
+import asyncio
+import random
+import statistics
+import time
+from collections import deque
+import aiohttp
+
+class UberDClient:
+    """HTTP client for the diablo2.io dclone API.
+
+    Requests use explicit connect and read timeouts and are retried with jittered
+    exponential backoff. After ``failure_threshold`` failed fetches in a row the
+    circuit opens and requests fail immediately for ``reset_timeout`` seconds, after
+    which a single probe request decides whether to close it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        connect_timeout=3,
+        read_timeout=5,
+        retries=2,
+        backoff_base=0.5,
+        backoff_max=8,
+        failure_threshold=5,
+        reset_timeout=60,
+    ):
+        self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.session = None
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=100)
+        self.outcomes = deque(maxlen=100)
+        self.last_error = None
+        self.last_success = None
+
+    async def start(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def allow_request(self):
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self, latency):
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.last_success = time.time()
+        self.state = self.CLOSED
+        self.probing = False
+
+    def record_failure(self, error):
+        self.failures += 1
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def fetch(self, url):
+        """Return the decoded JSON for ``url``, or None if it could not be fetched."""
+        if not self.allow_request():
+            self.rejected += 1
+            return None
+        await self.start()
+        self.requests += 1
+
+        error = None
+        for attempt in range(self.retries + 1):
+            started = time.monotonic()
+            try:
+                async with self.session.get(url) as response:
+                    if response.status == 200:
+                        data = await response.json(content_type=None)
+                        self.record_success(time.monotonic() - started)
+                        return data
+                    error = f"HTTP {response.status}"
+                    if response.status != 429 and response.status < 500:
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff(attempt))
+
+        self.record_failure(error)
+        return None
+
+    def health(self):
+        latencies = sorted(self.latencies)
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "error_rate": self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0,
+            "latency_p50": statistics.median(latencies) if latencies else None,
+            "latency_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+            "last_error": self.last_error,
+            "last_success": self.last_success,
+            "retry_in": max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)) if self.state == self.OPEN else None,
+        }
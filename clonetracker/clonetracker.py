@@ -1,43 +1,163 @@
 import asyncio
 import discord
-from redbot.core import commands
-import aiohttp
-import json
+from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
+from redbot.core.utils.chat_formatting import pagify
 import datetime
-from aiocache import cached
+import logging
+from .alerts import AlertDispatcher, diff_snapshots, progress_of
+from .client import UberDClient
+from .history import ProgressHistory
+from .snapshot import Snapshot
 
 class CloneTracker(commands.Cog):
     """Diablo Clone/Uber Diablo Tracker for Diablo 2: Resurrected"""
 
-    __version__ = "1.1.1"
+    __version__ = "1.2.0"
 
     REGIONS = {"americas": "1", "europe": "2", "asia": "3", "all": "0"}
     LADDERS = {"ladder": "1", "non-ladder": "2", "all": "0"}
     HARDCORES = {"hardcore": "1", "softcore": "2", "all": "0"}
+    TRACKED_REGIONS = ["americas", "europe", "asia"]
+    TRACKED_LADDERS = ["ladder", "non-ladder"]
+    TRACKED_HARDCORES = ["hardcore", "softcore"]
+    MAX_PARALLEL_FETCHES = 4
+    POLL_INTERVAL = 60
+    STALE_AFTER = 180
 
     def __init__(self, bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
+        self.client = UberDClient()
+        self.config = Config.get_conf(self, identifier=5172839460, force_registration=True)
+        self.config.register_guild(alerts={})
+        self.snapshot = None
+        self.poll_task = None
+        self.alert_tasks = set()
+        self.alerts = AlertDispatcher(bot)
+        self.history = ProgressHistory(str(cog_data_path(self) / "history"))
 
-    async def cog_cleanup(self):
-        await self.session.close()
+    @property
+    def tracked_combos(self):
+        return [
+            (region, ladder, hardcore)
+            for region in self.TRACKED_REGIONS for ladder in self.TRACKED_LADDERS for hardcore in self.TRACKED_HARDCORES
+        ]
 
-    @cached(ttl=120)
-    async def fetch_uberd_data(self, url):
+    async def cog_load(self):
+        self.alerts.load(await self.config.all_guilds())
+        await asyncio.to_thread(self.history.load, self.tracked_combos)
+        await self.client.start()
+        self.poll_task = asyncio.create_task(self.poll_loop())
+
+    async def cog_unload(self):
+        if self.poll_task:
+            self.poll_task.cancel()
+        for task in self.alert_tasks:
+            task.cancel()
+        await self.client.close()
+
+    async def poll_loop(self):
+        while True:
+            try:
+                await self.refresh_snapshot()
+            except Exception as e:
+                logging.error(f"CloneTracker poll failed: {e}")
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def refresh_snapshot(self):
+        progress = await self.fetch_progress(self.TRACKED_REGIONS, self.TRACKED_LADDERS, self.TRACKED_HARDCORES)
+        if all(entries is None for entries in progress.values()):
+            if self.snapshot:
+                self.snapshot = self.snapshot.failed(self.client.last_error or "diablo2.io did not respond")
+            return self.snapshot
+        previous, self.snapshot = self.snapshot, Snapshot.build(progress, self.snapshot)
+        await self.record_history(self.snapshot)
+        changes = diff_snapshots(previous, self.snapshot)
+        if changes:
+            task = asyncio.create_task(self.alerts.dispatch(changes))
+            self.alert_tasks.add(task)
+            task.add_done_callback(self.alert_tasks.discard)
+        return self.snapshot
+
+    async def record_history(self, snapshot):
+        transitions = []
+        for combo, entries in snapshot.progress.items():
+            progress = progress_of(entries)
+            if progress is None:
+                continue
+            try:
+                timestamp = int(entries[0]["timestamped"])
+            except (KeyError, TypeError, ValueError):
+                timestamp = int(snapshot.fetched_at)
+            transitions.append((combo, timestamp, progress))
+        writes = self.history.record(transitions)
+        if not writes:
+            return
         try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
-                    return None
-                data = await response.text()
-                return json.loads(data)
-        except aiohttp.ClientError as e:
+            await asyncio.to_thread(self.history.write, writes)
+        except OSError as e:
+            logging.error(f"Failed to record CloneTracker history: {e}")
+
+    def staleness_note(self, snapshot):
+        if snapshot.error is None and snapshot.age < self.STALE_AFTER:
             return None
+        reason = f" ({snapshot.error})" if snapshot.error else ""
+        return f"diablo2.io is not responding{reason}; showing data from <t:{int(snapshot.fetched_at)}:R>."
+
+    def unavailable_message(self):
+        """Explain why there is no snapshot yet."""
+        if self.client.last_error and (self.client.requests or self.client.rejected):
+            return f"Could not fetch Uber Diablo information from diablo2.io: {self.client.last_error}. Please try again later."
+        return "Uber Diablo information is still loading. Please try again in a moment."
+
+    async def fetch_uberd_data(self, url):
+        return await self.client.fetch(url)
 
     async def get_uberd_url(self, region_code, ladder_code, hardcore_code):
         base_url = "https://diablo2.io/dclone_api.php"
         url = f"{base_url}?region={region_code}&ladder={ladder_code}&hc={hardcore_code}"
         return url
 
+    async def fetch_progress(self, regions, ladders, hardcores):
+        """Fetch every region/ladder/hardcore combination in one request where possible.
+
+        A single ``region=<code or 0>&ladder=0&hc=0`` request is split locally by the
+        ``region``, ``ladder`` and ``hc`` fields of each entry. Combinations missing
+        from that response are fetched individually, a few at a time.
+        Returns a dict keyed by ``(region, ladder, hardcore)`` names whose values are
+        the entries for that combination, or None if fetching failed.
+        """
+        combos = [(region, ladder, hardcore) for region in regions for ladder in ladders for hardcore in hardcores]
+        region_code = self.REGIONS[regions[0]] if len(regions) == 1 else "0"
+        data = await self.fetch_uberd_data(await self.get_uberd_url(region_code, "0", "0"))
+        if data is None:
+            return {combo: None for combo in combos}
+
+        results = {}
+        for entry in data:
+            key = (str(entry.get("region")), str(entry.get("ladder")), str(entry.get("hc")))
+            results.setdefault(key, []).append(entry)
+        progress = {}
+        missing = []
+        for combo in combos:
+            region, ladder, hardcore = combo
+            codes = (self.REGIONS[region], self.LADDERS[ladder], self.HARDCORES[hardcore])
+            if codes in results:
+                progress[combo] = results[codes]
+            else:
+                missing.append((combo, codes))
+
+        semaphore = asyncio.Semaphore(self.MAX_PARALLEL_FETCHES)
+
+        async def fetch_one(codes):
+            async with semaphore:
+                return await self.fetch_uberd_data(await self.get_uberd_url(*codes))
+
+        fetched = await asyncio.gather(*(fetch_one(codes) for _, codes in missing))
+        for (combo, _), combo_data in zip(missing, fetched):
+            progress[combo] = combo_data
+        return progress
+
     async def validate_params(self, ctx, region, ladder, hardcore):
         if region.lower() not in self.REGIONS:
             await ctx.send("Invalid region specified. Valid regions are: Americas, Europe, Asia, All.")
@@ -62,24 +182,30 @@ class CloneTracker(commands.Cog):
         """
 
         region = region.lower()
-        valid_regions = ["americas", "europe", "asia"]
-        valid_ladders = ["ladder", "non-ladder"]
-        valid_hardcores = ["hardcore", "softcore"]
+        valid_regions = self.TRACKED_REGIONS
+        valid_ladders = self.TRACKED_LADDERS
+        valid_hardcores = self.TRACKED_HARDCORES
 
         if region not in valid_regions and region != "all":
             await ctx.send("Invalid region. Please choose from Americas, Europe, Asia or 'all'.")
             return
 
+        snapshot = self.snapshot
+        if snapshot is None:
+            await ctx.send(self.unavailable_message())
+            return
+
         regions_to_search = valid_regions if region == "all" else [region]
+        progress_data = snapshot.progress
+        note = self.staleness_note(snapshot)
 
         for region in regions_to_search:
-            embed = discord.Embed(title=f"Uber Diablo Status - {region.capitalize()}", color=discord.Color.red())
+            embed = discord.Embed(title=f"Uber Diablo Status - {region.capitalize()}", description=note, color=discord.Color.red())
             embed.set_footer(text="Data provided by Diablo2.io")
+            embed.timestamp = datetime.datetime.fromtimestamp(snapshot.fetched_at, datetime.timezone.utc)
             for ladder in valid_ladders:
                 for hardcore in valid_hardcores:
-                    
-                    url = await self.get_uberd_url(self.REGIONS[region], self.LADDERS[ladder], self.HARDCORES[hardcore])
-                    data = await self.fetch_uberd_data(url)
+                    data = progress_data[(region, ladder, hardcore)]
 
                     if data is None or not data:
                         error_message = "An error occurred while fetching Uber Diablo information." if data is None else "No information available."
@@ -100,23 +226,28 @@ class CloneTracker(commands.Cog):
         """Dumps Diablo clone data in raw text format"""
         
         region = region.lower()
-        valid_regions = ["americas", "europe", "asia"]
-        valid_ladders = ["ladder", "non-ladder"]
-        valid_hardcores = ["hardcore", "softcore"]
+        valid_regions = self.TRACKED_REGIONS
+        valid_ladders = self.TRACKED_LADDERS
+        valid_hardcores = self.TRACKED_HARDCORES
 
         if region not in valid_regions and region != "all":
             await ctx.send("Invalid region. Please choose from Americas, Europe, Asia or 'all'.")
             return
 
+        snapshot = self.snapshot
+        if snapshot is None:
+            await ctx.send(self.unavailable_message())
+            return
+
         regions_to_search = valid_regions if region == "all" else [region]
+        progress_data = snapshot.progress
+        note = self.staleness_note(snapshot)
 
-        messages = []
+        messages = [note] if note else []
         for region in regions_to_search:
             for ladder in valid_ladders:
                 for hardcore in valid_hardcores:
-                    
-                    url = await self.get_uberd_url(self.REGIONS[region], self.LADDERS[ladder], self.HARDCORES[hardcore])
-                    data = await self.fetch_uberd_data(url)
+                    data = progress_data[(region, ladder, hardcore)]
 
                     if data is None or not data:
                         error_message = "An error occurred" if data is None else "No information available"
@@ -127,3 +258,142 @@ class CloneTracker(commands.Cog):
                     messages.append(f"[{progress}/6] - {region.capitalize()} - {ladder.capitalize()} - {hardcore.capitalize()}")
 
         await ctx.send("\n".join(messages))
+
+    @commands.command()
+    @commands.is_owner()
+    @commands.bot_has_permissions(embed_links=True)
+    async def clonetrackerhealth(self, ctx):
+        """Show the health of the diablo2.io connection"""
+        health = self.client.health()
+
+        def ms(value):
+            return f"{value * 1000:.0f} ms" if value is not None else "n/a"
+
+        color = discord.Color.green() if health["state"] == UberDClient.CLOSED else discord.Color.red()
+        embed = discord.Embed(title="CloneTracker Upstream Health", color=color)
+        embed.add_field(name="Circuit", value=health["state"].capitalize())
+        embed.add_field(name="Requests", value=str(health["requests"]))
+        embed.add_field(name="Failures", value=str(health["failures"]))
+        embed.add_field(name="Rejected (circuit open)", value=str(health["rejected"]))
+        embed.add_field(name="Error Rate (last 100)", value=f"{health['error_rate']:.0%}")
+        embed.add_field(name="Latency (p50 / p95)", value=f"{ms(health['latency_p50'])} / {ms(health['latency_p95'])}")
+        if health["retry_in"] is not None:
+            embed.add_field(name="Next Probe", value=f"in {health['retry_in']:.0f}s")
+        if health["last_success"]:
+            embed.add_field(name="Last Success", value=f"<t:{int(health['last_success'])}:R>")
+        if self.snapshot:
+            embed.add_field(name="Snapshot Age", value=f"{self.snapshot.age:.0f}s")
+        if health["last_error"]:
+            embed.add_field(name="Last Error", value=health["last_error"][:1024], inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.bot_has_permissions(embed_links=True)
+    async def clonehistory(self, ctx, region: str, ladder: str, hardcore: str):
+        """
+        Show recorded Uber Diablo progress history and an estimate for 6/6
+        Options: Americas, Europe, Asia; Ladder, Non-Ladder; Hardcore, Softcore
+        """
+        combo = (region.lower(), ladder.lower(), hardcore.lower())
+        if combo not in self.tracked_combos:
+            await ctx.send("Please choose one region (Americas, Europe, Asia), ladder (Ladder, Non-Ladder) and mode (Hardcore, Softcore).")
+            return
+
+        summary = self.history.get(combo).summary()
+        if not summary["records"]:
+            await ctx.send("No history has been recorded for that tracker yet.")
+            return
+
+        def duration(seconds):
+            if seconds is None:
+                return "Not enough data"
+            hours, remainder = divmod(int(seconds), 3600)
+            days, hours = divmod(hours, 24)
+            minutes = remainder // 60
+            if days:
+                return f"{days}d {hours}h"
+            return f"{hours}h {minutes}m" if hours else f"{minutes}m"
+
+        title = " - ".join(part.capitalize() for part in combo)
+        embed = discord.Embed(title=f"Uber Diablo History - {title}", color=discord.Color.red())
+        embed.add_field(name="Current Progress", value=f"{summary['current']}/6")
+        embed.add_field(name="Recorded Spawns", value=str(summary["spawns"]))
+        embed.add_field(
+            name="Last Spawn",
+            value=f"<t:{summary['last_spawn']}:R>" if summary["last_spawn"] else "Not recorded yet"
+        )
+        embed.add_field(name="Time Between Spawns", value=duration(summary["cadence"]))
+        embed.add_field(
+            name="Estimated 6/6",
+            value=f"<t:{int(summary['eta'])}:R>" if summary["eta"] else "Not enough data"
+        )
+        embed.add_field(
+            name="Median Time per Stage",
+            value="\n".join(f"{stage}/6 → {stage + 1}/6: {duration(value)}" for stage, value in summary["stage_medians"].items()),
+            inline=False
+        )
+        embed.set_footer(text=f"{summary['records']} transitions recorded since")
+        embed.timestamp = datetime.datetime.fromtimestamp(summary["since"], datetime.timezone.utc)
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    @commands.group(name="clonealerts", invoke_without_command=True)
+    async def clonealerts(self, ctx):
+        """Post Uber Diablo progress changes to a channel."""
+        await ctx.send_help(ctx.command)
+
+    @clonealerts.command(name="add")
+    async def clonealerts_add(self, ctx, channel: discord.TextChannel, region: str, ladder: str = "all", hardcore: str = "all", threshold: int = 1, role: discord.Role = None):
+        """
+        Subscribe a channel to progress changes
+        Use 'all' for any of region, ladder or hardcore. Alerts are only sent once progress reaches the threshold.
+        """
+        if not await self.validate_params(ctx, region, ladder, hardcore):
+            return
+        if not 1 <= threshold <= 6:
+            await ctx.send("The threshold must be between 1 and 6.")
+            return
+
+        regions = self.TRACKED_REGIONS if region.lower() == "all" else [region.lower()]
+        ladders = self.TRACKED_LADDERS if ladder.lower() == "all" else [ladder.lower()]
+        hardcores = self.TRACKED_HARDCORES if hardcore.lower() == "all" else [hardcore.lower()]
+
+        async with self.config.guild(ctx.guild).alerts() as alerts:
+            subscription = alerts.get(str(channel.id), {"combos": []})
+            combos = {tuple(combo) for combo in subscription["combos"]}
+            combos.update((r, l, h) for r in regions for l in ladders for h in hardcores)
+            subscription = {"combos": sorted(list(combo) for combo in combos), "threshold": threshold, "role_id": role.id if role else None}
+            alerts[str(channel.id)] = subscription
+        self.alerts.subscribe(channel.id, subscription)
+        await ctx.send(f"{channel.mention} is now subscribed to {len(subscription['combos'])} Uber Diablo trackers.")
+
+    @clonealerts.command(name="remove")
+    async def clonealerts_remove(self, ctx, channel: discord.TextChannel):
+        """Stop sending progress changes to a channel"""
+        async with self.config.guild(ctx.guild).alerts() as alerts:
+            removed = alerts.pop(str(channel.id), None)
+        self.alerts.unsubscribe(channel.id)
+        if removed:
+            await ctx.send(f"{channel.mention} will no longer receive Uber Diablo alerts.")
+        else:
+            await ctx.send(f"{channel.mention} is not subscribed to Uber Diablo alerts.")
+
+    @clonealerts.command(name="list")
+    async def clonealerts_list(self, ctx):
+        """List the channels subscribed to progress changes"""
+        alerts = await self.config.guild(ctx.guild).alerts()
+        if not alerts:
+            await ctx.send("No channels are subscribed to Uber Diablo alerts.")
+            return
+
+        messages = []
+        for channel_id, subscription in alerts.items():
+            channel = ctx.guild.get_channel(int(channel_id))
+            role = ctx.guild.get_role(subscription["role_id"]) if subscription["role_id"] else None
+            combos = ", ".join(" - ".join(part.capitalize() for part in combo) for combo in subscription["combos"])
+            mention = f" (pings {role.name})" if role else ""
+            name = channel.mention if channel else f"Deleted channel {channel_id}"
+            messages.append(f"{name} from {subscription['threshold']}/6{mention}: {combos}")
+        for page in pagify("\n".join(messages)):
+            await ctx.send(page)
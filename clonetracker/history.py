@@ -0,0 +1,150 @@
+import os
+import statistics
+import struct
+import time
+from array import array
+
+RECORD = struct.Struct("<IB")
+
+class ComboHistory:
+    """Progress transitions for one region/ladder/hardcore combination.
+
+    Kept as two parallel arrays in memory and as fixed-size ``(timestamp, progress)``
+    records in an append-only file on disk. ``append`` and ``compact`` only change
+    the arrays; ``write`` does the file I/O.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.times = array("I")
+        self.progress = array("B")
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def last(self):
+        return self.progress[-1] if self.progress else None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        raw = raw[:len(raw) - len(raw) % RECORD.size]
+        for timestamp, progress in RECORD.iter_unpack(raw):
+            self.times.append(timestamp)
+            self.progress.append(progress)
+
+    def append(self, timestamp, progress):
+        self.times.append(timestamp)
+        self.progress.append(progress)
+
+    def compact(self, max_records, oldest):
+        """Drop records past ``max_records`` or older than ``oldest``; return True if any were dropped."""
+        start = max(len(self.times) - max_records, 0)
+        while start < len(self.times) and self.times[start] < oldest:
+            start += 1
+        if not start:
+            return False
+        self.times = self.times[start:]
+        self.progress = self.progress[start:]
+        return True
+
+    def pack(self, start=0):
+        return b"".join(RECORD.pack(t, p) for t, p in zip(self.times[start:], self.progress[start:]))
+
+    def write(self, data, rewrite=False):
+        """Append ``data`` to the file, or replace the file with it if ``rewrite``."""
+        if not rewrite:
+            with open(self.path, "ab") as f:
+                f.write(data)
+            return
+        with open(f"{self.path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def stage_durations(self):
+        """Seconds spent at each stage before advancing to the next one, keyed by stage."""
+        durations = {stage: [] for stage in range(1, 6)}
+        for i in range(1, len(self.times)):
+            before, after = self.progress[i - 1], self.progress[i]
+            if after == before + 1 and before in durations:
+                durations[before].append(self.times[i] - self.times[i - 1])
+        return durations
+
+    def spawn_times(self):
+        return [self.times[i] for i in range(len(self.times)) if self.progress[i] == 6 and (i == 0 or self.progress[i - 1] != 6)]
+
+    def summary(self, now=None):
+        now = now or time.time()
+        durations = self.stage_durations()
+        medians = {stage: statistics.median(values) if values else None for stage, values in durations.items()}
+        spawns = self.spawn_times()
+        gaps = [later - earlier for earlier, later in zip(spawns, spawns[1:])]
+
+        eta = None
+        if self.progress and self.progress[-1] < 6:
+            current = self.progress[-1]
+            remaining = [medians[stage] for stage in range(current, 6)]
+            if all(value is not None for value in remaining):
+                elapsed = now - self.times[-1]
+                eta = now + max(0, remaining[0] - elapsed) + sum(remaining[1:])
+
+        return {
+            "records": len(self.times),
+            "since": self.times[0] if self.times else None,
+            "current": self.last,
+            "spawns": len(spawns),
+            "last_spawn": spawns[-1] if spawns else None,
+            "cadence": statistics.median(gaps) if gaps else None,
+            "stage_medians": medians,
+            "eta": eta,
+        }
+
+class ProgressHistory:
+    """Append-only history of progress transitions for every tracked combination."""
+
+    MAX_RECORDS = 50_000
+    RETENTION = 180 * 24 * 3600
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.combos = {}
+
+    def get(self, combo):
+        history = self.combos.get(combo)
+        if history is None:
+            history = self.combos[combo] = ComboHistory(os.path.join(self.directory, "_".join(combo) + ".bin"))
+        return history
+
+    def load(self, combos):
+        os.makedirs(self.directory, exist_ok=True)
+        for combo in combos:
+            history = self.get(combo)
+            history.load()
+            if history.compact(self.MAX_RECORDS, time.time() - self.RETENTION):
+                history.write(history.pack(), rewrite=True)
+
+    def record(self, transitions):
+        """Add ``(combo, timestamp, progress)`` transitions that differ from the last stored value.
+
+        Only the in-memory arrays change, so call this on the event loop. Returns the
+        file writes to pass to ``write``.
+        """
+        writes = []
+        for combo, timestamp, progress in transitions:
+            history = self.get(combo)
+            if history.last == progress:
+                continue
+            history.append(timestamp, progress)
+            if len(history) > self.MAX_RECORDS * 1.25 and history.compact(self.MAX_RECORDS, time.time() - self.RETENTION):
+                writes.append((history, history.pack(), True))
+            else:
+                writes.append((history, history.pack(len(history) - 1), False))
+        return writes
+
+    @staticmethod
+    def write(writes):
+        for history, data, rewrite in writes:
+            history.write(data, rewrite)
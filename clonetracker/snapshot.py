@@ -0,0 +1,33 @@
+import time
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+class Snapshot(NamedTuple):
+    """Read-only copy of the dclone dataset taken by the poller.
+
+    ``progress`` maps ``(region, ladder, hardcore)`` names to a tuple of read-only
+    entries, or None if that combination has never been fetched successfully.
+    ``fetched_at`` is when the data was last refreshed and ``error`` holds the most
+    recent upstream failure since then, if any.
+    """
+
+    progress: MappingProxyType
+    fetched_at: float
+    error: Optional[str] = None
+
+    @classmethod
+    def build(cls, progress, previous=None):
+        frozen = {}
+        for combo, entries in progress.items():
+            if entries is None:
+                frozen[combo] = previous.progress.get(combo) if previous else None
+            else:
+                frozen[combo] = tuple(MappingProxyType(dict(entry)) for entry in entries)
+        return cls(MappingProxyType(frozen), time.time())
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def failed(self, error):
+        return self._replace(error=error)
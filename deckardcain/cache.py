@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+class AnswerCache:
+    """Answers keyed on the normalised question plus the prompt and model settings.
+
+    Entries expire after ``ttl`` seconds and the least recently used ones are dropped
+    once the stored answers pass ``max_bytes``. Identical questions that arrive while
+    an answer is being generated wait for that answer instead of asking again.
+    """
+
+    def __init__(self, ttl=7 * 24 * 3600, max_bytes=4 * 1024 * 1024, path=None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.path = path
+        self.entries = OrderedDict()
+        self.size = 0
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def normalize(question):
+        question = re.sub(r"[^\w\s]", " ", question.casefold())
+        return " ".join(question.split())
+
+    def key(self, question, params):
+        raw = json.dumps([self.normalize(question), params], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        answer, expires = entry
+        if expires < time.time():
+            self.remove(key)
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return answer
+
+    def put(self, key, answer):
+        self.remove(key)
+        self.entries[key] = (answer, time.time() + self.ttl)
+        self.size += len(answer.encode())
+        while self.size > self.max_bytes and self.entries:
+            self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.size -= len(entry[0].encode())
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def begin(self, key):
+        """Mark ``key`` as being generated so identical questions wait for it.
+
+        An answer already in flight for ``key`` is never replaced; its future is returned.
+        """
+        if key in self.inflight:
+            return self.inflight[key]
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        return future
+
+    def finish(self, key, answer=None, error=None):
+        future = self.inflight.pop(key, None)
+        if error is None and answer:
+            self.put(key, answer)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+            future.exception()
+        else:
+            future.set_result(answer)
+
+    async def get_or_compute(self, key, compute):
+        """Return a cached answer, join an identical request in flight, or run ``compute``."""
+        answer = self.get(key)
+        if answer is not None:
+            return answer
+        if key in self.inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self.inflight[key])
+
+        self.begin(key)
+        try:
+            answer = await compute()
+        except Exception as e:
+            self.finish(key, error=e)
+            raise
+        except BaseException:
+            self.finish(key, error=RuntimeError("The request was cancelled."))
+            raise
+        self.finish(key, answer)
+        return answer
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        now = time.time()
+        for key, answer, expires in stored:
+            if expires > now:
+                self.entries[key] = (answer, expires)
+                self.size += len(answer.encode())
+        while self.size > self.max_bytes and self.entries:
+            self.remove(next(iter(self.entries)))
+
+    def snapshot(self):
+        """Copy the cache for ``save``; call this on the event loop."""
+        return [[key, answer, expires] for key, (answer, expires) in self.entries.items()]
+
+    def save(self, stored):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(stored, f)
+        os.replace(f"{self.path}.tmp", self.path)
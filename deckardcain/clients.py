@@ -0,0 +1,82 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import httpx
+from openai import AsyncOpenAI
+
+class ClientPool:
+    """Keeps one ``AsyncOpenAI`` client per API key so connections are reused.
+
+    At most ``max_clients`` clients are kept; the least recently used one is closed
+    when a new key needs room. A client that is dropped while requests are still
+    using it is closed once the last of them finishes.
+    """
+
+    def __init__(self, max_clients=32, base_url=None):
+        self.max_clients = max_clients
+        self.base_url = base_url
+        self.clients = OrderedDict()
+        self.inflight = {}
+        self.retired = set()
+        self.closing = set()
+
+    def __len__(self):
+        return len(self.clients)
+
+    def get(self, api_key):
+        client = self.clients.get(api_key)
+        if client is not None:
+            self.clients.move_to_end(api_key)
+            return client
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+        client = AsyncOpenAI(api_key=api_key, base_url=self.base_url, http_client=http_client)
+        self.clients[api_key] = client
+        while len(self.clients) > self.max_clients:
+            _, oldest = self.clients.popitem(last=False)
+            self.retire(oldest)
+        return client
+
+    @asynccontextmanager
+    async def use(self, api_key):
+        """Borrow the client for ``api_key`` for the duration of a request."""
+        client = self.get(api_key)
+        self.inflight[client] = self.inflight.get(client, 0) + 1
+        try:
+            yield client
+        finally:
+            self.inflight[client] -= 1
+            if not self.inflight[client]:
+                del self.inflight[client]
+                if client in self.retired:
+                    self.retired.discard(client)
+                    self.close_later(client)
+
+    def retire(self, client):
+        if self.inflight.get(client):
+            self.retired.add(client)
+        else:
+            self.close_later(client)
+
+    def close_later(self, client):
+        task = asyncio.create_task(client.close())
+        self.closing.add(task)
+        task.add_done_callback(self.closing.discard)
+
+    async def evict(self, api_key):
+        client = self.clients.pop(api_key, None)
+        if client is None:
+            return
+        if self.inflight.get(client):
+            self.retired.add(client)
+        else:
+            await client.close()
+
+    async def close(self):
+        clients = list(self.clients.values()) + list(self.retired)
+        self.clients.clear()
+        self.retired.clear()
+        await asyncio.gather(*(client.close() for client in clients), *self.closing, return_exceptions=True)
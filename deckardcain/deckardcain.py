@@ -1,7 +1,13 @@
 import discord
 from redbot.core import commands, Config
-from openai import AsyncOpenAI
+from redbot.core.data_manager import cog_data_path
 import asyncio
+import logging
+from .cache import AnswerCache
+from .clients import ClientPool
+from .memory import ConversationMemory
+from .scheduler import BudgetExceeded, RequestScheduler
+from .streaming import StreamingReply
 
 class DeckardCain(commands.Cog):
     """Deckard Cain as AI
@@ -10,10 +16,67 @@ class DeckardCain(commands.Cog):
 
     __version__ = "1.0.6"
 
+    MODEL = "gpt-3.5-turbo-instruct"
+    MAX_TOKENS = 600
+    TEMPERATURE = 0.5
+
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1928374650)
-        self.config.register_guild(api_key=None, allowed_channel=None)
+        self.config.register_guild(
+            api_key=None,
+            allowed_channel=None,
+            stream=False,
+            memory="off",
+            concurrency=2,
+            requests_per_minute=10,
+            daily_tokens=100000
+        )
+        self.config.register_global(persist_cache=True)
+        self.clients = ClientPool()
+        self.cache = AnswerCache(path=str(cog_data_path(self) / "answer_cache.json"))
+        self.scheduler = RequestScheduler()
+        self.allowed_channels = set()
+        self.conversations = ConversationMemory()
+
+    async def cog_load(self):
+        for guild_id, data in (await self.config.all_guilds()).items():
+            if data["allowed_channel"]:
+                self.allowed_channels.add(data["allowed_channel"])
+            self.scheduler.configure(guild_id, data["concurrency"], data["requests_per_minute"], data["daily_tokens"])
+        if await self.config.persist_cache():
+            try:
+                await asyncio.to_thread(self.cache.load)
+            except (OSError, ValueError, TypeError) as e:
+                logging.error(f"Failed to load the Deckard Cain answer cache: {e}")
+                self.cache.clear()
+
+    async def cog_unload(self):
+        await self.clients.close()
+        if await self.config.persist_cache():
+            await asyncio.to_thread(self.cache.save, self.cache.snapshot())
+
+    @property
+    def cache_params(self):
+        return {
+            "model": self.MODEL,
+            "max_tokens": self.MAX_TOKENS,
+            "temperature": self.TEMPERATURE,
+            "prompt": self.build_prompt("{question}"),
+        }
+
+    def cache_key(self, question, history=()):
+        params = self.cache_params
+        if history:
+            params["history"] = history
+        return self.cache.key(question, params)
+
+    def memory_key(self, mode, guild, channel, author):
+        if mode == "channel":
+            return (guild.id, channel.id)
+        if mode == "user":
+            return (guild.id, channel.id, author.id)
+        return None
 
     @commands.guild_only()
     @commands.has_permissions(administrator=True)
@@ -30,7 +93,10 @@ class DeckardCain(commands.Cog):
                 await ctx.send("I do not have permissions to delete messages in this channel.")
                 return
 
+            old_key = await self.config.guild(ctx.guild).api_key()
             await self.config.guild(ctx.guild).api_key.set(api_key)
+            if old_key and old_key != api_key:
+                await self.clients.evict(old_key)
             confirmation_message = await ctx.send("API key has been set successfully. This message will be deleted shortly.")
             await ctx.message.delete()
             await asyncio.sleep(3)
@@ -50,6 +116,7 @@ class DeckardCain(commands.Cog):
                 return
 
             await self.config.guild(ctx.guild).api_key.clear()
+            await self.clients.evict(current_key)
             await ctx.send("The API key has been wiped successfully.")
         except Exception as e:
             await ctx.send(f"Error wiping the API key: {str(e)}")
@@ -58,13 +125,96 @@ class DeckardCain(commands.Cog):
     async def channel(self, ctx, channel: discord.TextChannel = None):
         """Restricts direct messages to Deckard Cain to a specified channel
         Run the command without a channel to clear the database."""
+        self.allowed_channels.discard(await self.config.guild(ctx.guild).allowed_channel())
         if channel is None:
             await self.config.guild(ctx.guild).allowed_channel.clear()
             await ctx.send("The channel restriction for `Deckard Cain` has been removed.")
         else:
             await self.config.guild(ctx.guild).allowed_channel.set(channel.id)
+            self.allowed_channels.add(channel.id)
             await ctx.send(f"The channel '{channel.name}' has been set as the allowed channel for directly talking to `Deckard Cain`.")
 
+    @cainset.command()
+    async def stream(self, ctx, enabled: bool):
+        """Post answers while they are being written instead of waiting for the full answer"""
+        await self.config.guild(ctx.guild).stream.set(enabled)
+        if enabled:
+            await ctx.send("`Deckard Cain` will now stream his answers.")
+        else:
+            await ctx.send("`Deckard Cain` will now send his answers once they are complete.")
+
+    @cainset.command()
+    async def memory(self, ctx, mode: str):
+        """Let Deckard Cain remember recent questions
+        Use `channel` to share one conversation per channel, `user` for one per member or `off` to forget everything."""
+        mode = mode.lower()
+        if mode not in ("off", "channel", "user"):
+            await ctx.send("The memory mode must be `off`, `channel` or `user`.")
+            return
+        await self.config.guild(ctx.guild).memory.set(mode)
+        self.conversations.forget_guild(ctx.guild.id)
+        if mode == "off":
+            await ctx.send("`Deckard Cain` will no longer remember previous questions.")
+        else:
+            await ctx.send(f"`Deckard Cain` will now remember recent questions per {mode}.")
+
+    @cainset.command()
+    async def limits(self, ctx, concurrency: int, requests_per_minute: int, daily_tokens: int):
+        """Limit how hard this server can use OpenAI
+        Concurrency is the number of answers generated at once. Use 0 for no per-minute or daily limit."""
+        if concurrency < 1 or requests_per_minute < 0 or daily_tokens < 0:
+            await ctx.send("Concurrency must be at least 1 and the other limits cannot be negative.")
+            return
+        guild_config = self.config.guild(ctx.guild)
+        await guild_config.concurrency.set(concurrency)
+        await guild_config.requests_per_minute.set(requests_per_minute)
+        await guild_config.daily_tokens.set(daily_tokens)
+        self.scheduler.configure(ctx.guild.id, concurrency, requests_per_minute, daily_tokens)
+        await ctx.send(
+            f"`Deckard Cain` will answer {concurrency} questions at a time, "
+            f"{requests_per_minute or 'unlimited'} per minute, using up to {daily_tokens or 'unlimited'} tokens per day."
+        )
+
+    @cainset.command()
+    async def usage(self, ctx):
+        """Show how much this server has used OpenAI"""
+        budget = self.scheduler.budget(ctx.guild.id)
+        budget.roll_day()
+        embed = discord.Embed(title="Deckard Cain Usage", color=discord.Color.dark_gold())
+        embed.add_field(name="Answering Now", value=f"{budget.active}/{budget.concurrency}")
+        embed.add_field(name="Waiting", value=f"{self.scheduler.queued(ctx.guild.id)} (peak {budget.peak_queue})")
+        embed.add_field(name="Requests Per Minute", value=str(budget.requests_per_minute or "Unlimited"))
+        embed.add_field(name="Tokens Today", value=f"{budget.tokens_today}/{budget.daily_tokens or 'Unlimited'}")
+        embed.add_field(name="Tokens Since Load", value=str(budget.tokens_total))
+        embed.add_field(name="Requests Since Load", value=str(budget.requests))
+        embed.add_field(name="Turned Away", value=str(budget.rejected))
+        embed.add_field(
+            name="Answer Cache",
+            value=f"{len(self.cache.entries)} answers, {self.cache.hits} hits, {self.cache.coalesced} shared",
+            inline=False
+        )
+        embed.set_footer(text="Token counts are estimated from text length.")
+        await ctx.send(embed=embed)
+
+    @cainset.command()
+    @commands.is_owner()
+    async def clearcache(self, ctx):
+        """Forget every cached answer"""
+        self.cache.clear()
+        if await self.config.persist_cache():
+            await asyncio.to_thread(self.cache.save, self.cache.snapshot())
+        await ctx.send("The answer cache has been cleared.")
+
+    @cainset.command()
+    @commands.is_owner()
+    async def persistcache(self, ctx, enabled: bool):
+        """Keep cached answers on disk between restarts"""
+        await self.config.persist_cache.set(enabled)
+        if enabled:
+            await ctx.send("Cached answers will be saved to disk when the cog unloads.")
+        else:
+            await ctx.send("Cached answers will only be kept in memory.")
+
     @commands.command()
     @commands.guild_only()
     async def askcain(self, ctx, *, question):
@@ -75,49 +225,143 @@ class DeckardCain(commands.Cog):
             api_key = await self.config.guild(ctx.guild).api_key()
 
             if api_key:
-                response = await self.generate_response(question, api_key)
-                await ctx.send(response)
+                await self.reply(ctx.channel, ctx.guild, ctx.author, question, api_key)
             else:
                 await ctx.send("API key not set! Use the command `[p]cainset apikey`.")
         else:
             allowed_channel = self.bot.get_channel(allowed_channel_id)
             await ctx.send(f"The `[p]askcain` command can only be used in {allowed_channel.mention}.")
 
-    async def generate_response(self, question, api_key):
-        client = AsyncOpenAI(api_key=api_key)
+    async def reply(self, channel, guild, author, question, api_key):
+        guild_config = self.config.guild(guild)
+        memory_key = self.memory_key(await guild_config.memory(), guild, channel, author)
+        history = self.conversations.context(memory_key) if memory_key else []
+        key = self.cache_key(question, history)
+        cached = self.cache.get(key)
+        if cached:
+            await self.send_answer(channel, cached)
+            if memory_key:
+                self.conversations.remember(memory_key, question, cached)
+            return
+
+        if key in self.cache.inflight:
+            response = await self.generate_response(question, api_key, history)
+            await self.send_answer(channel, response)
+            return
+
+        notice = None
 
-        prompt = (
+        async def on_queued(position):
+            nonlocal notice
+            notice = await channel.send(f"`Deckard Cain` is busy. You are number {position} in line.")
+
+        prompt = self.build_prompt(question, history)
+        stream = await guild_config.stream()
+        try:
+            async with self.scheduler.slot(guild.id, on_queued) as budget:
+                if notice:
+                    await notice.delete()
+                # An identical question may have been answered or started while this one waited.
+                shared = key in self.cache.inflight or key in self.cache.entries
+                if stream and not shared:
+                    answer = await self.stream_reply(channel, key, prompt, api_key)
+                else:
+                    try:
+                        answer = await self.cache.get_or_compute(key, lambda: self.request_completion(prompt, api_key))
+                    except Exception as e:
+                        answer = None
+                        await channel.send(f"An error occurred: {str(e)}")
+                    else:
+                        await self.send_answer(channel, answer)
+                if answer and not shared:
+                    budget.record((len(prompt) + len(answer)) // 4)
+                    if memory_key:
+                        self.conversations.remember(memory_key, question, answer)
+        except BudgetExceeded:
+            await channel.send("`Deckard Cain` has answered enough questions for today. Please try again tomorrow.")
+
+    async def send_answer(self, channel, answer):
+        """Send a complete answer, split the same way streamed answers are."""
+        reply = StreamingReply(channel)
+        await reply.feed(answer)
+        await reply.finish(fallback="I have no answer for that.")
+
+    async def stream_reply(self, channel, key, prompt, api_key):
+        """Stream the answer into ``channel`` and return it, or None if it failed."""
+        reply = StreamingReply(channel)
+        chunks = []
+        failed = False
+        self.cache.begin(key)
+        try:
+            async for chunk in self.stream_response(prompt, api_key):
+                chunks.append(chunk)
+                await reply.feed(chunk)
+        except Exception as e:
+            failed = True
+            self.cache.finish(key, error=e)
+            await reply.feed(f"\nAn error occurred: {str(e)}")
+        else:
+            self.cache.finish(key, "".join(chunks).strip())
+        finally:
+            if key in self.cache.inflight:
+                self.cache.finish(key, error=RuntimeError("The answer was interrupted."))
+        await reply.finish(fallback="I have no answer for that.")
+        return None if failed else "".join(chunks).strip()
+
+    def build_prompt(self, question, history=()):
+        conversation = "".join(f"Question: {q}\nAnswer: {a}\n" for q, a in history)
+        return (
             "You are Deckard Cain, the last of the Horadrim from the Diablo universe. "
             "Respond to the following question with wisdom and knowledge from your extensive lore experience.\n"
+            f"{conversation}"
             f"Question: {question}\n"
             "Answer:"
         )
 
+    async def generate_response(self, question, api_key, history=()):
+        key = self.cache_key(question, history)
+        prompt = self.build_prompt(question, history)
         try:
+            return await self.cache.get_or_compute(key, lambda: self.request_completion(prompt, api_key))
+        except Exception as e:
+            return f"An error occurred: {str(e)}"
+
+    async def request_completion(self, prompt, api_key):
+        async with self.clients.use(api_key) as client:
             response = await client.completions.create(
-                model="gpt-3.5-turbo-instruct",
+                model=self.MODEL,
                 prompt=prompt,
-                max_tokens=600,
-                temperature=0.5
+                max_tokens=self.MAX_TOKENS,
+                temperature=self.TEMPERATURE
             )
+        return response.choices[0].text.strip()
 
-            response_content = response.choices[0].text.strip()
-            return response_content
-        except Exception as e:
-            return f"An error occurred: {str(e)}"
+    async def stream_response(self, prompt, api_key):
+        async with self.clients.use(api_key) as client:
+            response = await client.completions.create(
+                model=self.MODEL,
+                prompt=prompt,
+                max_tokens=self.MAX_TOKENS,
+                temperature=self.TEMPERATURE,
+                stream=True
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].text:
+                    yield chunk.choices[0].text
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.author == self.bot.user:
+        if message.channel.id not in self.allowed_channels:
+            return
+        if message.guild is None or message.author == self.bot.user:
             return
 
         allowed_channel_id = await self.config.guild(message.guild).allowed_channel()
 
-        if allowed_channel_id and message.channel.id == allowed_channel_id:
+        if message.channel.id == allowed_channel_id:
             api_key = await self.config.guild(message.guild).api_key()
 
             if api_key:
-                response = await self.generate_response(message.content, api_key)
-                await message.channel.send(response)
+                await self.reply(message.channel, message.guild, message.author, message.content, api_key)
             else:
                 await message.channel.send("API key not set! Use the command `[p]cainset apikey`.")
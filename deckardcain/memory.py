@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict, deque
+
+class ConversationMemory:
+    """Recent question and answer turns, kept per conversation key.
+
+    Each conversation keeps only the newest turns that fit in ``max_tokens`` and is
+    forgotten after ``idle_timeout`` seconds without a question. At most
+    ``max_conversations`` are kept; the least recently active one is dropped first.
+    Keys are tuples that start with the guild ID, so a guild's conversations can be
+    dropped together.
+    """
+
+    def __init__(self, max_tokens=500, idle_timeout=1800, max_conversations=500):
+        self.max_tokens = max_tokens
+        self.idle_timeout = idle_timeout
+        self.max_conversations = max_conversations
+        self.conversations = OrderedDict()
+        self.guilds = {}
+
+    def __len__(self):
+        return len(self.conversations)
+
+    @staticmethod
+    def estimate_tokens(text):
+        return len(text) // 4 + 1
+
+    def expire(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        while self.conversations:
+            key, (last_used, _) = next(iter(self.conversations.items()))
+            if last_used >= cutoff:
+                break
+            self.forget(key)
+
+    def context(self, key):
+        """Return the turns for ``key`` that fit in the token budget, oldest first."""
+        self.expire()
+        entry = self.conversations.get(key)
+        if entry is None:
+            return []
+        return [(question, answer) for question, answer, _ in entry[1]]
+
+    def remember(self, key, question, answer):
+        self.expire()
+        entry = self.conversations.pop(key, None)
+        turns = entry[1] if entry else deque()
+        tokens = self.estimate_tokens(question) + self.estimate_tokens(answer)
+        if tokens <= self.max_tokens:
+            turns.append((question, answer, tokens))
+        while sum(turn[2] for turn in turns) > self.max_tokens:
+            turns.popleft()
+        if turns:
+            self.conversations[key] = (time.monotonic(), turns)
+            self.guilds.setdefault(key[0], set()).add(key)
+        else:
+            self.forget(key)
+        while len(self.conversations) > self.max_conversations:
+            self.forget(next(iter(self.conversations)))
+
+    def forget(self, key):
+        self.conversations.pop(key, None)
+        keys = self.guilds.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.guilds[key[0]]
+
+    def forget_guild(self, guild_id):
+        for key in self.guilds.pop(guild_id, ()):
+            self.conversations.pop(key, None)
+
+    def clear(self):
+        self.conversations.clear()
+        self.guilds.clear()
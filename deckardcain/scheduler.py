@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+class BudgetExceeded(Exception):
+    pass
+
+class GuildBudget:
+    """Limits and usage counters for one guild."""
+
+    def __init__(self, concurrency=2, requests_per_minute=10, daily_tokens=100_000):
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.daily_tokens = daily_tokens
+        self.active = 0
+        self.allowance = float(requests_per_minute)
+        self.refilled_at = time.monotonic()
+        self.day = None
+        self.tokens_today = 0
+        self.tokens_total = 0
+        self.requests = 0
+        self.rejected = 0
+        self.peak_queue = 0
+
+    def configure(self, concurrency, requests_per_minute, daily_tokens):
+        if not self.requests_per_minute:
+            self.allowance = float(requests_per_minute)
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.daily_tokens = daily_tokens
+        self.allowance = max(0.0, min(self.allowance, float(requests_per_minute)))
+
+    def roll_day(self):
+        today = datetime.now(timezone.utc).date()
+        if self.day != today:
+            self.day = today
+            self.tokens_today = 0
+
+    def over_budget(self):
+        self.roll_day()
+        return bool(self.daily_tokens) and self.tokens_today >= self.daily_tokens
+
+    def request_wait(self):
+        """Seconds until the per-minute bucket has a request available."""
+        if not self.requests_per_minute:
+            return 0.0
+        now = time.monotonic()
+        rate = self.requests_per_minute / 60
+        self.allowance = min(float(self.requests_per_minute), self.allowance + (now - self.refilled_at) * rate)
+        self.refilled_at = now
+        return 0.0 if self.allowance >= 1 else (1 - self.allowance) / rate
+
+    def record(self, tokens):
+        self.roll_day()
+        self.tokens_today += tokens
+        self.tokens_total += tokens
+
+class RequestScheduler:
+    """Fair, budgeted access to the completions API.
+
+    Every guild has a concurrency cap, a requests-per-minute token bucket and a
+    daily token budget. Waiting requests are queued per guild and guilds are served
+    round-robin, so one busy guild cannot starve the others. ``max_concurrency``
+    caps the requests in flight across all guilds.
+    """
+
+    def __init__(self, max_concurrency=8):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.budgets = {}
+        self.queues = OrderedDict()
+        self.timer = None
+
+    def budget(self, guild_id):
+        budget = self.budgets.get(guild_id)
+        if budget is None:
+            budget = self.budgets[guild_id] = GuildBudget()
+        return budget
+
+    def configure(self, guild_id, concurrency, requests_per_minute, daily_tokens):
+        self.budget(guild_id).configure(concurrency, requests_per_minute, daily_tokens)
+        self.pump()
+
+    def queued(self, guild_id):
+        return len(self.queues.get(guild_id, ()))
+
+    @asynccontextmanager
+    async def slot(self, guild_id, on_queued=None):
+        """Wait for a turn for ``guild_id``; ``on_queued`` is awaited with the queue position if it has to wait."""
+        budget = self.budget(guild_id)
+        if budget.over_budget():
+            budget.rejected += 1
+            raise BudgetExceeded()
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self.queues.setdefault(guild_id, deque())
+        queue.append(future)
+        budget.peak_queue = max(budget.peak_queue, len(queue))
+        self.pump()
+        if not future.done():
+            try:
+                if on_queued:
+                    await on_queued(len(queue))
+                await future
+            except BaseException:
+                if future.done() and not future.cancelled():
+                    self.release(guild_id)
+                else:
+                    future.cancel()
+                raise
+            if budget.over_budget():
+                self.release(guild_id)
+                budget.rejected += 1
+                raise BudgetExceeded()
+
+        budget.requests += 1
+        try:
+            yield budget
+        finally:
+            self.release(guild_id)
+
+    def release(self, guild_id):
+        self.budget(guild_id).active -= 1
+        self.active -= 1
+        self.pump()
+
+    def pump(self):
+        next_wait = None
+        progressed = True
+        while progressed and self.active < self.max_concurrency:
+            progressed = False
+            for guild_id in list(self.queues):
+                queue = self.queues[guild_id]
+                while queue and queue[0].done():
+                    queue.popleft()
+                if not queue:
+                    del self.queues[guild_id]
+                    continue
+                budget = self.budget(guild_id)
+                if budget.active >= budget.concurrency:
+                    continue
+                wait = budget.request_wait()
+                if wait:
+                    next_wait = wait if next_wait is None else min(next_wait, wait)
+                    continue
+
+                if budget.requests_per_minute:
+                    budget.allowance -= 1
+                budget.active += 1
+                self.active += 1
+                queue.popleft().set_result(None)
+                self.queues.move_to_end(guild_id)
+                progressed = True
+                break
+
+        if next_wait is not None and self.timer is None:
+            def wake():
+                self.timer = None
+                self.pump()
+            self.timer = asyncio.get_running_loop().call_later(next_wait, wake)
@@ -0,0 +1,55 @@
+import time
+
+class StreamingReply:
+    """Sends a reply as soon as text arrives and keeps editing it as more comes in.
+
+    Edits are coalesced to at most one every ``edit_interval`` seconds. Once a
+    message would pass Discord's 2000 character limit it is finished at the last
+    whitespace and the rest continues in a new message.
+    """
+
+    LIMIT = 2000
+
+    def __init__(self, channel, edit_interval=1.2):
+        self.channel = channel
+        self.edit_interval = edit_interval
+        self.message = None
+        self.text = ""
+        self.shown = ""
+        self.last_edit = 0.0
+        self.first_sent_at = None
+
+    async def feed(self, chunk):
+        if not self.text:
+            chunk = chunk.lstrip()
+        if not chunk:
+            return
+        self.text += chunk
+        while len(self.text) > self.LIMIT:
+            split = self.text.rfind(" ", 0, self.LIMIT)
+            split = self.LIMIT if split <= 0 else split
+            head, self.text = self.text[:split], self.text[split:].lstrip()
+            await self.show(head)
+            self.message = None
+            self.shown = ""
+        if self.message is None or time.monotonic() - self.last_edit >= self.edit_interval:
+            await self.show(self.text)
+
+    async def show(self, content):
+        content = content.rstrip()
+        if not content or content == self.shown:
+            return
+        if self.message is None:
+            self.message = await self.channel.send(content)
+            if self.first_sent_at is None:
+                self.first_sent_at = time.monotonic()
+        else:
+            await self.message.edit(content=content)
+        self.shown = content
+        self.last_edit = time.monotonic()
+
+    async def finish(self, fallback=None):
+        if self.text.strip():
+            await self.show(self.text)
+        elif self.message is None and fallback:
+            await self.channel.send(fallback)
@@ -1,8 +1,14 @@
 import discord
 from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
 import aiohttp
-import urllib.parse
+import asyncio
 import binascii
+import io
+import logging
+from .gallery import GalleryCache, compose_grid
+from .images import AvatarCache
+from .resolver import GaiaResolver
 
 class GaiaAvatar:
     SALT = 'lksdfou'
@@ -23,7 +29,8 @@ class GaiaAvatar:
         return f'{cls.AVA_CDN}{base[-2:]}/{base[-4:-2]}/{base}{variant}.png'
 
 class AvatarDropdown(discord.ui.Select):
-    def __init__(self, user_id, username):
+    def __init__(self, cog, user_id, username):
+        self.cog = cog
         self.user_id = user_id
         self.username = username  
         options = [
@@ -36,22 +43,103 @@ class AvatarDropdown(discord.ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         variant = "" if self.values[0] == "default" else f"_{self.values[0]}"
-        avatar_url = GaiaAvatar.to_url(self.user_id, variant)
-
-        embed = discord.Embed(title=f'{self.username}', color=discord.Color.blue())
-        embed.set_image(url=avatar_url)
-        await interaction.response.edit_message(embed=embed, view=self.view)
+        embed, file = await self.cog.avatar_embed(self.user_id, self.username, variant)
+        await interaction.response.edit_message(
+            embed=embed, attachments=[file] if file else [], view=self.view
+        )
 
 class AvatarView(discord.ui.View):
-    def __init__(self, user_id, username):
+    VARIANTS = ["", "_flip", "_96x96", "_strip"]
+
+    def __init__(self, cog, user_id, username):
         super().__init__(timeout=None)
-        self.add_item(AvatarDropdown(user_id, username))
+        self.add_item(AvatarDropdown(cog, user_id, username))
 
 class GaiaIntegration(commands.Cog):
+    SAVE_INTERVAL = 300
+    IMAGE_TIMEOUT = 2
+    GALLERY_LIMIT = 60
+    RESOLVE_CONCURRENCY = 5
+    DOWNLOAD_CONCURRENCY = 8
+
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=8475638592, force_registration=True)
         self.config.register_user(gaia_userid=None, gaia_username=None)
+        self.config.register_global(cache_images=False)
+        self.resolver = GaiaResolver(path=str(cog_data_path(self) / "gaia_ids.json"))
+        self.images = AvatarCache(str(cog_data_path(self) / "avatars"))
+        self.galleries = GalleryCache()
+        self.cache_images = False
+        self.prefetches = set()
+        self.save_task = None
+
+    async def cog_load(self):
+        self.cache_images = await self.config.cache_images()
+        try:
+            await asyncio.to_thread(self.resolver.load)
+            await asyncio.to_thread(self.images.load)
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to load the Gaia Online caches: {e}")
+        self.save_task = asyncio.create_task(self.save_loop())
+
+    async def cog_unload(self):
+        if self.save_task:
+            self.save_task.cancel()
+        for task in self.prefetches:
+            task.cancel()
+        await self.resolver.close()
+        await self.save_resolver()
+
+    async def save_loop(self):
+        while True:
+            await asyncio.sleep(self.SAVE_INTERVAL)
+            await self.save_resolver()
+
+    async def save_resolver(self):
+        try:
+            if self.resolver.dirty:
+                await asyncio.to_thread(self.resolver.save, self.resolver.snapshot())
+        except OSError as e:
+            self.resolver.dirty = True
+            logging.error(f"Failed to save the Gaia Online ID cache: {e}")
+        try:
+            if self.images.dirty:
+                await asyncio.to_thread(self.images.save, self.images.snapshot())
+        except OSError as e:
+            self.images.dirty = True
+            logging.error(f"Failed to save the Gaia Online avatar index: {e}")
+
+    async def avatar_embed(self, user_id, username, variant=""):
+        """Build the avatar embed, attaching a locally cached image when image caching is on."""
+        avatar_url = GaiaAvatar.to_url(user_id, variant)
+        embed = discord.Embed(title=f'{username}', color=discord.Color.blue())
+        data = None
+        if self.cache_images:
+            download = asyncio.shield(self.images.get(await self.resolver.start(), avatar_url))
+            try:
+                data = await asyncio.wait_for(download, timeout=self.IMAGE_TIMEOUT)
+            except asyncio.TimeoutError:
+                data = None
+        if data is None:
+            embed.set_image(url=avatar_url)
+            return embed, None
+        filename = f"{user_id}{variant}.png"
+        embed.set_image(url=f"attachment://{filename}")
+        return embed, discord.File(io.BytesIO(data), filename=filename)
+
+    async def send_avatar(self, ctx, user_id, username):
+        embed, file = await self.avatar_embed(user_id, username)
+        view = AvatarView(self, user_id, username)
+        if file:
+            await ctx.send(embed=embed, file=file, view=view)
+            session = await self.resolver.start()
+            for variant in AvatarView.VARIANTS[1:]:
+                task = asyncio.create_task(self.images.get(session, GaiaAvatar.to_url(user_id, variant)))
+                self.prefetches.add(task)
+                task.add_done_callback(self.prefetches.discard)
+        else:
+            await ctx.send(embed=embed, view=view)
 
     @commands.guild_only()
     @commands.group(name="gaia", aliases=["go"], invoke_without_command=True)
@@ -67,10 +155,7 @@ class GaiaIntegration(commands.Cog):
             await ctx.send(f'No user ID found for "{username}".')
             return
 
-        avatar_url = GaiaAvatar.to_url(user_id)
-        embed = discord.Embed(title=f'{username}', color=discord.Color.blue())
-        embed.set_image(url=avatar_url)
-        await ctx.send(embed=embed, view=AvatarView(user_id, username))
+        await self.send_avatar(ctx, user_id, username)
 
     @gaia_group.command(name="save")
     async def gaia_save(self, ctx, *, username: str):
@@ -93,10 +178,79 @@ class GaiaIntegration(commands.Cog):
             await ctx.send("You haven't set a username yet. Use `.go save [username]` to save it.")
             return
 
-        avatar_url = GaiaAvatar.to_url(user_id)
-        embed = discord.Embed(title=f'{username}', color=discord.Color.blue())
-        embed.set_image(url=avatar_url)
-        await ctx.send(embed=embed, view=AvatarView(user_id, username))
+        await self.send_avatar(ctx, user_id, username)
+
+    @gaia_group.command(name="gallery")
+    async def gaia_gallery(self, ctx, *, usernames: str = None):
+        """Show many avatars in one image.
+        Separate usernames with commas, or leave them out to show every member who saved a username."""
+        if usernames:
+            names = list(dict.fromkeys(name.strip() for name in usernames.split(",") if name.strip()))
+            skipped = max(0, len(names) - self.GALLERY_LIMIT)
+            names = names[:self.GALLERY_LIMIT]
+            async with ctx.typing():
+                resolved = await self.resolve_many(names)
+            missing = [name for name, user_id in resolved if not user_id]
+            found = [(name, user_id) for name, user_id in resolved if user_id]
+        else:
+            skipped = 0
+            missing = []
+            found = []
+            for member_id, data in (await self.config.all_users()).items():
+                if data.get("gaia_userid") and ctx.guild.get_member(member_id):
+                    found.append((data["gaia_username"], data["gaia_userid"]))
+
+        found = list({user_id: (name, user_id) for name, user_id in found}.values())
+        if not found:
+            await ctx.send("No Gaia Online avatars to show.")
+            return
+        skipped += max(0, len(found) - self.GALLERY_LIMIT)
+        found = sorted(found, key=lambda entry: entry[0].casefold())[:self.GALLERY_LIMIT]
+
+        key = self.galleries.key(user_id for _, user_id in found)
+        image = self.galleries.get(key)
+        if image is None:
+            async with ctx.typing():
+                avatars = await self.download_many(found)
+                image = await asyncio.to_thread(compose_grid, avatars)
+            self.galleries.put(key, image)
+
+        embed = discord.Embed(title=f"Gaia Online Gallery ({len(found)})", color=discord.Color.blue())
+        embed.set_image(url="attachment://gallery.png")
+        notes = []
+        if missing:
+            notes.append(f"Not found: {', '.join(missing)}")
+        if skipped:
+            notes.append(f"{skipped} more not shown")
+        if notes:
+            embed.set_footer(text=" | ".join(notes)[:2048])
+        await ctx.send(embed=embed, file=discord.File(io.BytesIO(image), filename="gallery.png"))
+
+    async def resolve_many(self, names):
+        semaphore = asyncio.Semaphore(self.RESOLVE_CONCURRENCY)
+
+        async def resolve(name):
+            async with semaphore:
+                return name, await self.resolver.resolve(name)
+
+        return await asyncio.gather(*(resolve(name) for name in names))
+
+    async def download_many(self, found):
+        semaphore = asyncio.Semaphore(self.DOWNLOAD_CONCURRENCY)
+        session = await self.resolver.start()
+
+        async def download(name, user_id):
+            url = GaiaAvatar.to_url(user_id)
+            async with semaphore:
+                if self.cache_images:
+                    return name, await self.images.get(session, url) or b""
+                try:
+                    async with session.get(url) as response:
+                        return name, await response.read() if response.status == 200 else b""
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    return name, b""
+
+        return await asyncio.gather(*(download(name, user_id) for name, user_id in found))
 
     @gaia_group.command(name="wipe")
     async def gaia_wipe(self, ctx):
@@ -104,19 +258,26 @@ class GaiaIntegration(commands.Cog):
         await self.config.user(ctx.author).clear()
         await ctx.send("Your Gaia Online user ID has been deleted from the database.")
 
-    async def retrieve_gaiaid(self, username):
-        encoded_username = urllib.parse.quote(username)
-        profile_url = f"https://www.gaiaonline.com/profiles/{encoded_username}"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(profile_url, allow_redirects=True) as response:
-                if response.status != 200:
-                    return None
+    @commands.is_owner()
+    @gaia_group.command(name="imagecache")
+    async def gaia_imagecache(self, ctx, enabled: bool = None):
+        """Serve avatars from a local image cache instead of the Gaia CDN.
+        Run the command without a value to see the cache size."""
+        if enabled is None:
+            state = "enabled" if self.cache_images else "disabled"
+            await ctx.send(
+                f"Avatar image caching is {state}: {len(self.images.entries)} images, "
+                f"{self.images.size / 1024 / 1024:.1f} MiB of {self.images.max_bytes / 1024 / 1024:.0f} MiB."
+            )
+            return
+        await self.config.cache_images.set(enabled)
+        self.cache_images = enabled
+        if enabled:
+            await ctx.send("Avatars will now be downloaded and attached from the local cache.")
+        else:
+            await asyncio.to_thread(self.images.remove_files, self.images.clear())
+            await self.save_resolver()
+            await ctx.send("Avatars will now be linked from the Gaia CDN and the local cache has been cleared.")
 
-                final_url = str(response.url)
-                try:
-                    user_id = final_url.rstrip('/').split('/')[-1]
-                    if user_id.isdigit():
-                        return int(user_id)
-                except Exception:
-                    return None
\ No newline at end of file
+    async def retrieve_gaiaid(self, username):
+        return await self.resolver.resolve(username)
@@ -0,0 +1,80 @@
+import io
+import math
+import time
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageFont
+
+CELL_WIDTH = 120
+CELL_HEIGHT = 150
+LABEL_HEIGHT = 18
+MAX_COLUMNS = 10
+BACKGROUND = (47, 49, 54, 255)
+LABEL_COLOR = (220, 221, 222, 255)
+
+def compose_grid(avatars):
+    """Paste ``(label, png_bytes)`` pairs into one labelled grid and return it as PNG bytes.
+
+    This is CPU bound and is meant to run off the event loop.
+    """
+    columns = min(MAX_COLUMNS, max(1, math.ceil(math.sqrt(len(avatars)))))
+    rows = math.ceil(len(avatars) / columns)
+    cell_height = CELL_HEIGHT + LABEL_HEIGHT
+    grid = Image.new("RGBA", (columns * CELL_WIDTH, rows * cell_height), BACKGROUND)
+    draw = ImageDraw.Draw(grid)
+    font = ImageFont.load_default()
+
+    for index, (label, data) in enumerate(avatars):
+        x = (index % columns) * CELL_WIDTH
+        y = (index // columns) * cell_height
+        try:
+            with Image.open(io.BytesIO(data)) as avatar:
+                avatar = avatar.convert("RGBA")
+                avatar.thumbnail((CELL_WIDTH, CELL_HEIGHT))
+                offset = (x + (CELL_WIDTH - avatar.width) // 2, y + CELL_HEIGHT - avatar.height)
+                grid.alpha_composite(avatar, offset)
+        except (OSError, ValueError):
+            pass
+        while label and draw.textlength(label, font=font) > CELL_WIDTH - 4:
+            label = label[:-1]
+        width = draw.textlength(label, font=font)
+        draw.text((x + (CELL_WIDTH - width) / 2, y + CELL_HEIGHT + 3), label, fill=LABEL_COLOR, font=font)
+
+    output = io.BytesIO()
+    grid.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+class GalleryCache:
+    """Finished gallery images keyed by the set of user IDs they show."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.size = 0
+
+    @staticmethod
+    def key(user_ids):
+        return frozenset(user_ids)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        data, created = entry
+        if time.time() - created > self.ttl:
+            self.remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        self.remove(key)
+        self.entries[key] = (data, time.time())
+        self.size += len(data)
+        while self.size > self.max_bytes and self.entries:
+            self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.size -= len(entry[0])
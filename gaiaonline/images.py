@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+import aiohttp
+
+class AvatarCache:
+    """Avatar PNGs kept on disk, keyed by their CDN URL.
+
+    A stored image is used as is for ``revalidate_after`` seconds and then
+    revalidated with ``If-None-Match``/``If-Modified-Since``. If the CDN is down
+    the stored copy is still served. The least recently used images are deleted
+    once the directory passes ``max_bytes``.
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, revalidate_after=3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.index_path = os.path.join(directory, "index.json")
+        self.entries = OrderedDict()
+        self.size = 0
+        self.inflight = {}
+        self.dirty = False
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def file_path(self, key):
+        return os.path.join(self.directory, f"{key}.png")
+
+    async def get(self, session, url):
+        """Return the PNG bytes for ``url``, or None if it is neither cached nor reachable."""
+        key = self.key(url)
+        if key in self.inflight:
+            return await asyncio.shield(self.inflight[key])
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            data = await self.fetch(session, url, key)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self.inflight.pop(key, None)
+        future.set_result(data)
+        return data
+
+    async def fetch(self, session, url, key):
+        entry = self.entries.get(key)
+        data = None
+        if entry is not None:
+            self.entries.move_to_end(key)
+            try:
+                data = await asyncio.to_thread(self.read, key)
+            except OSError:
+                self.drop(key)
+                entry = None
+        if entry is not None and time.time() - entry["checked_at"] < self.revalidate_after:
+            self.hits += 1
+            return data
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and entry is not None:
+                    self.revalidated += 1
+                    entry["checked_at"] = time.time()
+                    self.dirty = True
+                    return data
+                if response.status != 200:
+                    return data
+                body = await response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"Failed to download Gaia Online avatar {url}: {e}")
+            return data
+
+        self.downloads += 1
+        try:
+            await asyncio.to_thread(self.write, key, body)
+        except OSError as e:
+            logging.error(f"Failed to cache Gaia Online avatar {url}: {e}")
+            return body
+        self.drop(key, delete=False)
+        self.entries[key] = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "size": len(body),
+            "checked_at": time.time(),
+        }
+        self.size += len(body)
+        self.dirty = True
+        await self.evict()
+        return body
+
+    def read(self, key):
+        with open(self.file_path(key), "rb") as f:
+            return f.read()
+
+    def write(self, key, body):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.file_path(key)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(body)
+        os.replace(f"{path}.tmp", path)
+
+    def drop(self, key, delete=True):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        self.size -= entry["size"]
+        self.dirty = True
+        if delete:
+            return self.file_path(key)
+        return None
+
+    async def evict(self):
+        stale = []
+        while self.size > self.max_bytes and self.entries:
+            stale.append(self.drop(next(iter(self.entries))))
+        if stale:
+            await asyncio.to_thread(self.remove_files, stale)
+
+    @staticmethod
+    def remove_files(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """Forget every image and return the files to delete with ``remove_files``."""
+        paths = [self.file_path(key) for key in self.entries]
+        self.entries.clear()
+        self.size = 0
+        self.dirty = True
+        return paths
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        for key, entry in stored:
+            if os.path.exists(self.file_path(key)):
+                self.entries[key] = entry
+                self.size += entry["size"]
+
+    def snapshot(self):
+        """Copy the index for ``save``; call this on the event loop."""
+        self.dirty = False
+        return [(key, dict(entry)) for key, entry in self.entries.items()]
+
+    def save(self, stored):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f"{self.index_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(stored, f)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
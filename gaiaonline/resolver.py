@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import time
+import urllib.parse
+from collections import OrderedDict
+import aiohttp
+
+class GaiaResolver:
+    """Resolves Gaia Online usernames to user IDs.
+
+    IDs never change, so found IDs are kept until they fall out of the
+    ``max_entries`` LRU. Usernames that do not exist are remembered for
+    ``negative_ttl`` seconds. The cache is saved to ``path`` and a single
+    ``aiohttp`` session is shared by every lookup.
+    """
+
+    PROFILE_URL = "https://www.gaiaonline.com/profiles/"
+    MAX_REDIRECTS = 5
+
+    def __init__(self, path=None, max_entries=10_000, negative_ttl=3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.session = None
+        self.dirty = False
+        self.hits = 0
+        self.lookups = 0
+
+    @staticmethod
+    def normalize(username):
+        return " ".join(username.split()).casefold()
+
+    async def start(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15, sock_connect=5),
+                headers={"User-Agent": "Mozilla/5.0 (compatible; Red-DiscordBot GaiaOnline cog)"},
+            )
+        return self.session
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def cached(self, key):
+        """Return ``(found, user_id)`` for ``key`` without touching the network."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        user_id, stored_at = entry
+        if user_id is None and time.time() - stored_at > self.negative_ttl:
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, user_id
+
+    def remember(self, username, user_id):
+        key = self.normalize(username)
+        self.entries[key] = (user_id, time.time())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    async def resolve(self, username):
+        """Return the user ID for ``username``, or None if there is no such user."""
+        key = self.normalize(username)
+        found, user_id = self.cached(key)
+        if found:
+            self.hits += 1
+            return user_id
+        if key in self.inflight:
+            return await asyncio.shield(self.inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            user_id = await self.lookup(username)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            user_id = None
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            self.remember(username, user_id)
+        finally:
+            self.inflight.pop(key, None)
+        if not future.done():
+            future.set_result(user_id)
+        return user_id
+
+    async def lookup(self, username):
+        """Follow the profile redirects only until one of them names a numeric ID."""
+        self.lookups += 1
+        session = await self.start()
+        url = self.PROFILE_URL + urllib.parse.quote(username.strip())
+        for _ in range(self.MAX_REDIRECTS + 1):
+            user_id = self.id_from_url(url)
+            if user_id:
+                return user_id
+            async with session.get(url, allow_redirects=False) as response:
+                if response.status in (301, 302, 303, 307, 308) and "Location" in response.headers:
+                    url = urllib.parse.urljoin(url, response.headers["Location"])
+                    continue
+                if response.status != 200:
+                    if response.status >= 500 or response.status == 429:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status
+                        )
+                    return None
+                last = str(response.url).rstrip("/").split("/")[-1]
+                return int(last) if last.isdigit() else None
+        return None
+
+    @staticmethod
+    def id_from_url(url):
+        parts = urllib.parse.urlsplit(url).path.strip("/").split("/")
+        if len(parts) < 3 or parts[0] != "profiles" or not parts[-1].isdigit():
+            return None
+        return int(parts[-1])
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        for key, user_id, stored_at in stored[-self.max_entries:]:
+            self.entries[key] = (user_id, stored_at)
+
+    def snapshot(self):
+        """Copy the cache for ``save``; call this on the event loop."""
+        self.dirty = False
+        return [[key, user_id, stored_at] for key, (user_id, stored_at) in self.entries.items()]
+
+    def save(self, stored):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(stored, f)
+        os.replace(f"{self.path}.tmp", self.path)
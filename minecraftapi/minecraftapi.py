@@ -1,8 +1,8 @@
 import discord
 import logging
 from redbot.core import commands, app_commands
-from mojang import API
 from .mcserver import MinecraftServerInfo
+from .profiles import MojangClient, MojangError
 
 
 class MinecraftAPI(commands.Cog):
@@ -10,8 +10,11 @@ class MinecraftAPI(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.api = API()
-        
+        self.api = MojangClient()
+
+    async def cog_unload(self):
+        await self.api.close()
+
     @commands.guild_only()
     @commands.hybrid_group(name="minecraft", aliases=["mc"], invoke_without_command=True)
     async def minecraft(self, ctx: commands.Context):
@@ -23,7 +26,7 @@ class MinecraftAPI(commands.Cog):
         """Look up a Minecraft player's profile"""
         try:
             await ctx.defer()
-            uuid = self.api.get_uuid(player)
+            uuid = await self.api.get_uuid(player)
             if not uuid:
                 await ctx.send(f"Player '{player}' not found.", ephemeral=True)
                 return
@@ -46,12 +49,31 @@ class MinecraftAPI(commands.Cog):
             await ctx.send(f"An error occurred: {e}", ephemeral=True)
             logging.error(f"An error occurred: {e}")
 
+    @minecraft.command(name="players", description="Look up the UUIDs of up to ten Minecraft players at once.")
+    async def lookupplayers(self, ctx: commands.Context, *, players: str):
+        """Look up the UUIDs of several Minecraft players
+        Separate the names with spaces."""
+        names = list(dict.fromkeys(players.split()))[:MojangClient.BATCH_SIZE]
+        try:
+            await ctx.defer()
+            uuids = await self.api.get_uuids(names)
+        except MojangError as e:
+            await ctx.send(str(e), ephemeral=True)
+            return
+
+        embed = discord.Embed(title="Players", color=discord.Color.blurple())
+        for name in names:
+            uuid = uuids[name]
+            value = f"[`{uuid}`](https://namemc.com/profile/{uuid})" if uuid else "Not found"
+            embed.add_field(name=name, value=value, inline=False)
+        await ctx.send(embed=embed)
+
     @minecraft.command(name="cape", description="Look up a Minecraft player's cape by name.")
     async def lookupcape(self, ctx: commands.Context, player: str):
         """Look up a Minecraft player's cape"""
         try:
             await ctx.defer()
-            uuid = self.api.get_uuid(player)
+            uuid = await self.api.get_uuid(player)
             if not uuid:
                 await ctx.send(f"Player '{player}' not found.", ephemeral=True)
                 return
@@ -76,7 +98,7 @@ class MinecraftAPI(commands.Cog):
         """Look up a Minecraft player's skin"""
         try:
             await ctx.defer()
-            uuid = self.api.get_uuid(player)
+            uuid = await self.api.get_uuid(player)
             if not uuid:
                 await ctx.send(f"Player '{player}' not found.", ephemeral=True)
                 return
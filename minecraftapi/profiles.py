@@ -0,0 +1,144 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+import aiohttp
+
+class MojangError(Exception):
+    pass
+
+class MojangClient:
+    """Async name to UUID lookups against the Mojang API.
+
+    Names asked for within ``batch_delay`` seconds of each other are resolved
+    together through the bulk profile endpoint, ten names per request. Found
+    UUIDs are cached for ``ttl`` seconds and unknown names for ``negative_ttl``.
+    """
+
+    BULK_URL = "https://api.minecraftservices.com/minecraft/profile/lookup/bulk/byname"
+    BATCH_SIZE = 10
+    VALID_NAME = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+
+    def __init__(self, ttl=3600, negative_ttl=300, max_entries=5000, batch_delay=0.05):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.batch_delay = batch_delay
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.flush_handle = None
+        self.tasks = set()
+        self.session = None
+        self.requests = 0
+        self.hits = 0
+
+    async def start(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10, sock_connect=5))
+        return self.session
+
+    async def close(self):
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        for task in self.tasks:
+            task.cancel()
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def cached(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        uuid, expires = entry
+        if expires < time.time():
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, uuid
+
+    def remember(self, key, uuid):
+        ttl = self.ttl if uuid else self.negative_ttl
+        self.entries[key] = (uuid, time.time() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get_uuid(self, name):
+        """Return the undashed UUID for ``name``, or None if no such player exists."""
+        return (await self.get_uuids([name]))[name]
+
+    async def get_uuids(self, names):
+        """Return a ``{name: uuid or None}`` mapping for ``names``."""
+        results = {}
+        waiting = {}
+        for name in names:
+            if not self.VALID_NAME.match(name):
+                results[name] = None
+                continue
+            key = name.casefold()
+            found, uuid = self.cached(key)
+            if found:
+                self.hits += 1
+                results[name] = uuid
+                continue
+            future = self.pending.get(key)
+            if future is None:
+                future = self.pending[key] = asyncio.get_running_loop().create_future()
+                self.schedule_flush()
+            waiting[name] = future
+        for name, future in waiting.items():
+            results[name] = await asyncio.shield(future)
+        return results
+
+    def schedule_flush(self):
+        if len(self.pending) >= self.BATCH_SIZE:
+            if self.flush_handle:
+                self.flush_handle.cancel()
+                self.flush_handle = None
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self.flush)
+
+    def flush(self):
+        self.flush_handle = None
+        while self.pending:
+            batch = dict(list(self.pending.items())[:self.BATCH_SIZE])
+            for key in batch:
+                del self.pending[key]
+            task = asyncio.create_task(self.lookup(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def lookup(self, batch):
+        try:
+            found = await self.fetch_bulk(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+            return
+        for key, future in batch.items():
+            uuid = found.get(key)
+            self.remember(key, uuid)
+            if not future.done():
+                future.set_result(uuid)
+
+    async def fetch_bulk(self, names):
+        session = await self.start()
+        self.requests += 1
+        try:
+            async with session.post(self.BULK_URL, json=names) as response:
+                if response.status == 429:
+                    raise MojangError("Mojang is rate limiting lookups, please try again shortly.")
+                if response.status != 200:
+                    raise MojangError(f"Mojang API returned HTTP {response.status}.")
+                profiles = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise MojangError(f"Could not reach the Mojang API: {type(e).__name__}") from e
+        return {profile["name"].casefold(): profile["id"] for profile in profiles}